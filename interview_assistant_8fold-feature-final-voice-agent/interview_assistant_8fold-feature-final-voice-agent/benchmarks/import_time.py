@@ -0,0 +1,111 @@
+"""
+Import-time benchmark for the FastAPI app.
+
+Measures how long `import main` takes in a fresh interpreter and fails if
+any heavy, lazily-loaded dependency sneaks back into module scope.
+
+Usage:
+    python benchmarks/import_time.py [--runs 5] [--budget-ms 1500] [--top 15]
+
+Exits non-zero on regression, so it can run in CI.
+"""
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules that must NOT be loaded by `import main` (see the lazy imports in main.py / auth.py)
+FORBIDDEN_MODULES = [
+    "langchain",
+    "langchain_core",
+    "langchain_google_genai",
+    "langgraph",
+    "google.generativeai",
+    "pypdf",
+    "fpdf",
+    "passlib",
+    "interview_agent",
+    "pdf_generator",
+]
+
+PROBE = """
+import sys, time, json
+start = time.perf_counter()
+import main
+elapsed = time.perf_counter() - start
+forbidden = %r
+loaded = sorted(m for m in forbidden if m in sys.modules)
+print(json.dumps({"elapsed_ms": elapsed * 1000, "loaded": loaded}))
+""" % (FORBIDDEN_MODULES,)
+
+
+def run_probe(env):
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE],
+        cwd=APP_DIR, env=env, capture_output=True, text=True
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"`import main` failed:\n{proc.stderr[-2000:]}")
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    result["importtime"] = parse_importtime(proc.stderr)
+    return result
+
+
+def parse_importtime(stderr):
+    """Parses `-X importtime` output into (cumulative_us, self_us, module) rows."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        try:
+            # Nested imports keep their indentation (two spaces per level)
+            rows.append((int(cumulative_us), int(self_us), name[1:]))
+        except ValueError:
+            continue
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark `import main` startup cost.")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=float(os.getenv("IMPORT_BUDGET_MS", "1500")))
+    parser.add_argument("--top", type=int, default=15, help="Show the N slowest imports made by main")
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    # Importing main must not touch a real database or need API keys
+    env.setdefault("DATABASE_URL", "sqlite:///:memory:")
+
+    results = [run_probe(env) for _ in range(args.runs)]
+    timings = [r["elapsed_ms"] for r in results]
+    median_ms = statistics.median(timings)
+
+    print(f"import main: median {median_ms:.1f} ms, min {min(timings):.1f} ms, max {max(timings):.1f} ms over {args.runs} runs")
+
+    # Direct imports of main (one indent level) from the last run, by cumulative time
+    direct = [row for row in results[-1]["importtime"] if row[2].startswith("  ") and not row[2].startswith("   ")]
+    direct.sort(reverse=True)
+    print("\nSlowest imports made by main (cumulative):")
+    for cumulative_us, _, name in direct[:args.top]:
+        print(f"  {cumulative_us / 1000:8.1f} ms  {name.strip()}")
+
+    failed = False
+    loaded = results[-1]["loaded"]
+    if loaded:
+        print(f"\nFAIL: heavy modules loaded at import time: {', '.join(loaded)}")
+        failed = True
+    if median_ms > args.budget_ms:
+        print(f"\nFAIL: median import time {median_ms:.1f} ms exceeds budget {args.budget_ms:.0f} ms")
+        failed = True
+    if not failed:
+        print("\nOK")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,319 @@
+"""
+Offline load test for main.app.
+
+Runs the real FastAPI app under uvicorn (in a background thread) against a
+throwaway SQLite database, with the Gemini client swapped for the
+deterministic FakeChatModel (LLM_PROVIDER=fake). Drives N concurrent
+synthetic interviews through:
+
+    /start_interview -> /stream_interview x k -> /end_interview
+
+and reports p50/p95/p99 for time-to-first-token, turn latency and
+end-of-interview latency, plus memory retained per session.
+
+A streamed turn whose LLM call fails still returns 200 (with an apology) and
+is rolled back server-side, so failed turns are detected from the session's
+question_count and left out of the latency percentiles. The server's own
+llm_errors_total / interview_turns_abandoned_total deltas are reported too.
+
+Usage:
+    python benchmarks/load_test.py --sessions 50 --concurrency 10 --turns 5 \
+        --token-latency-ms 20 --failure-rate 0.02 [--json results.json]
+
+Requires httpx (pip install httpx) in addition to requirements.txt.
+Note: the client runs in the same process as the server, so numbers include
+some GIL contention from the load generator itself.
+"""
+import os
+import sys
+import gc
+import json
+import time
+import socket
+import asyncio
+import shutil
+import argparse
+import tempfile
+import threading
+import logging
+import tracemalloc
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, APP_DIR)
+
+ANSWERS = [
+    "I built a FastAPI service that handled about two thousand requests per second using async workers.",
+    "I'm not sure, I haven't worked with that.",
+    "We used PostgreSQL with read replicas and cached hot queries in Redis to cut p95 latency in half.",
+    "Could we skip this one?",
+    "(Candidate remained silent)",
+]
+
+
+# --- Helpers ---
+
+def percentile(values, pct):
+    """Nearest-rank percentile; None for an empty sample."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * pct // 100))  # ceil without math import
+    return ordered[int(rank) - 1]
+
+
+def summarize(values):
+    return {
+        "count": len(values),
+        "p50": percentile(values, 50),
+        "p95": percentile(values, 95),
+        "p99": percentile(values, 99),
+        "max": max(values) if values else None,
+    }
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def current_rss_bytes():
+    """Resident set size from /proc (Linux); None elsewhere."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return None
+
+
+def counter_totals(name):
+    """Sums of a Prometheus counter in this process's registry, keyed by label values."""
+    from prometheus_client import REGISTRY
+    totals = {}
+    for metric in REGISTRY.collect():
+        for sample in metric.samples:
+            if sample.name == f"{name}_total":
+                key = "/".join(sample.labels.values()) or "all"
+                totals[key] = totals.get(key, 0) + sample.value
+    return totals
+
+
+def counter_deltas(before, after):
+    return {k: int(v - before.get(k, 0)) for k, v in after.items() if v - before.get(k, 0)}
+
+
+def question_count(session_id):
+    """Server-side turn counter; it only advances when a streamed turn is committed (same process)."""
+    import main
+    state = main.get_agent().graph.get_state({"configurable": {"thread_id": session_id}}).values
+    return state.get("question_count", 0)
+
+
+def make_resume_pdf():
+    from fpdf import FPDF
+    pdf = FPDF()
+    pdf.add_page()
+    pdf.set_font("Helvetica", size=11)
+    pdf.multi_cell(0, 6, "Jane Doe - Backend Engineer. 5 years Python, FastAPI, PostgreSQL, "
+                         "Kubernetes. Led migration of a monolith to event-driven services.")
+    return bytes(pdf.output())
+
+
+def configure_env(args, workdir):
+    """Must run before main is imported: these are read at import time."""
+    os.environ["LLM_PROVIDER"] = "fake"
+    os.environ["FAKE_LLM_TOKEN_LATENCY_MS"] = str(args.token_latency_ms)
+    os.environ["FAKE_LLM_FIRST_TOKEN_LATENCY_MS"] = str(args.first_token_latency_ms)
+    os.environ["FAKE_LLM_FAILURE_RATE"] = str(args.failure_rate)
+    os.environ["FAKE_LLM_SEED"] = str(args.seed)
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'loadtest.db')}"
+    os.environ["REPORTS_DIR"] = os.path.join(workdir, "reports")
+    os.environ["CREATE_SCHEMA_ON_STARTUP"] = "true"
+
+
+def start_server(port):
+    import uvicorn
+    import main
+
+    # Build the agent up front so lazy imports don't count against the first sessions
+    main.get_agent()
+
+    config = uvicorn.Config(main.app, host="127.0.0.1", port=port, log_level="warning")
+    server = uvicorn.Server(config)
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    return server, thread
+
+
+# --- Load Generation ---
+
+async def register(client, idx):
+    resp = await client.post("/register", json={"email": f"load{idx}@example.com", "password": "load-test-pw"})
+    resp.raise_for_status()
+    return resp.json()["access_token"]
+
+
+async def run_session(client, token, resume_pdf, turns, metrics, errors):
+    headers = {"Authorization": f"Bearer {token}"}
+
+    t0 = time.perf_counter()
+    resp = await client.post(
+        "/start_interview",
+        data={"job_description": "Senior Backend Engineer: Python, FastAPI, distributed systems."},
+        files={"resume": ("resume.pdf", resume_pdf, "application/pdf")},
+        headers=headers,
+    )
+    metrics["start"].append(time.perf_counter() - t0)
+    if resp.status_code != 200:
+        errors["start"] += 1
+        return
+    session_id = resp.json()["session_id"]
+
+    for turn in range(turns):
+        payload = {"session_id": session_id, "response": ANSWERS[turn % len(ANSWERS)]}
+        t0 = time.perf_counter()
+        first_token = None
+        committed_before = question_count(session_id)
+        try:
+            async with client.stream("POST", "/stream_interview", json=payload) as stream:
+                if stream.status_code != 200:
+                    errors["turn"] += 1
+                    continue
+                async for chunk in stream.aiter_raw():
+                    if chunk and first_token is None:
+                        first_token = time.perf_counter() - t0
+        except Exception:
+            errors["turn"] += 1
+            continue
+        elapsed = time.perf_counter() - t0
+        if question_count(session_id) == committed_before:
+            errors["turn"] += 1  # LLM failed mid-turn: apology streamed with 200, turn rolled back
+            continue
+        metrics["turn"].append(elapsed)
+        if first_token is not None:
+            metrics["ttft"].append(first_token)
+
+    t0 = time.perf_counter()
+    resp = await client.post("/end_interview", json={"session_id": session_id})
+    metrics["end"].append(time.perf_counter() - t0)
+    if resp.status_code != 200 or resp.headers.get("content-type") != "application/pdf":
+        errors["end"] += 1
+
+
+async def drive(args, port):
+    import httpx
+
+    metrics = {"start": [], "ttft": [], "turn": [], "end": []}
+    errors = {"start": 0, "turn": 0, "end": 0}
+    resume_pdf = make_resume_pdf()
+    limits = httpx.Limits(max_connections=args.concurrency * 2)
+    timeout = httpx.Timeout(args.timeout)
+
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=timeout) as client:
+        # Setup (not measured): one user per session
+        tokens = [await register(client, i) for i in range(args.sessions)]
+
+        gc.collect()
+        llm_errors_before = counter_totals("llm_errors")
+        abandoned_before = counter_totals("interview_turns_abandoned")
+        rss_before = current_rss_bytes()
+        traced_before = tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else None
+
+        semaphore = asyncio.Semaphore(args.concurrency)
+
+        async def bounded(token):
+            async with semaphore:
+                await run_session(client, token, resume_pdf, args.turns, metrics, errors)
+
+        wall_start = time.perf_counter()
+        await asyncio.gather(*(bounded(t) for t in tokens))
+        wall = time.perf_counter() - wall_start
+
+        gc.collect()
+        rss_after = current_rss_bytes()
+        traced_after = tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else None
+
+    memory = {}
+    if rss_before is not None and rss_after is not None:
+        memory["rss_delta_per_session_bytes"] = (rss_after - rss_before) / args.sessions
+    if traced_before is not None:
+        memory["traced_retained_per_session_bytes"] = (traced_after - traced_before) / args.sessions
+
+    return {
+        "config": vars(args),
+        "wall_seconds": wall,
+        "sessions_per_second": args.sessions / wall if wall else None,
+        "latency_seconds": {name: summarize(values) for name, values in metrics.items()},
+        "errors": errors,
+        # Server-side view, keyed by label values (endpoint/node, reason/action)
+        "server_errors": {
+            "llm_errors": counter_deltas(llm_errors_before, counter_totals("llm_errors")),
+            "turns_abandoned": counter_deltas(abandoned_before, counter_totals("interview_turns_abandoned")),
+        },
+        "memory": memory,
+    }
+
+
+def print_report(result):
+    cfg = result["config"]
+    print(f"\n{cfg['sessions']} sessions x {cfg['turns']} turns, concurrency {cfg['concurrency']}, "
+          f"token latency {cfg['token_latency_ms']} ms, failure rate {cfg['failure_rate']}")
+    print(f"wall {result['wall_seconds']:.2f} s, {result['sessions_per_second']:.2f} sessions/s\n")
+
+    labels = {"start": "start_interview", "ttft": "time-to-first-token", "turn": "turn latency", "end": "end_interview"}
+    print(f"{'metric':<22}{'n':>6}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for name, label in labels.items():
+        s = result["latency_seconds"][name]
+        cells = [f"{s[k] * 1000:10.1f}" if s[k] is not None else f"{'-':>10}" for k in ("p50", "p95", "p99", "max")]
+        print(f"{label:<22}{s['count']:>6}{''.join(cells)}")
+
+    print(f"\nerrors: {result['errors']}")
+    print(f"server llm errors: {result['server_errors']['llm_errors']}")
+    print(f"server abandoned turns: {result['server_errors']['turns_abandoned']}")
+    for name, value in result["memory"].items():
+        print(f"{name}: {value / 1024:.1f} KiB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline load test for the interview API.")
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--turns", type=int, default=3)
+    parser.add_argument("--token-latency-ms", type=float, default=10)
+    parser.add_argument("--first-token-latency-ms", type=float, default=100)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--timeout", type=float, default=120)
+    parser.add_argument("--tracemalloc", action="store_true",
+                        help="Measure retained Python heap per session (slows everything down)")
+    parser.add_argument("--json", help="Also write the full result to this file")
+    args = parser.parse_args()
+
+    # Per-request client/PDF logging would dominate the output
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    logging.getLogger("pdf_generator").setLevel(logging.WARNING)
+
+    workdir = tempfile.mkdtemp(prefix="interview-loadtest-")
+    configure_env(args, workdir)
+    if args.tracemalloc:
+        tracemalloc.start()
+
+    port = free_port()
+    server, thread = start_server(port)
+    try:
+        result = asyncio.run(drive(args, port))
+    finally:
+        server.should_exit = True
+        thread.join(timeout=10)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print_report(result)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+"""
+Streaming bulk export of interview history.
+
+Rows are read through a server-side cursor (yield_per) and written out in
+batches, so memory stays constant no matter how many interviews match.
+Used by GET /export and runnable as a CLI:
+
+    python export.py --format csv --rows turns --since 2026-01-01 -o interviews.csv.gz
+"""
+import io
+import csv
+import sys
+import json
+import zlib
+import argparse
+import logging
+from datetime import datetime
+from typing import Iterator, Optional
+from sqlalchemy import select
+from database import SessionLocal
+from models import User, Interview
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+FORMATS = ("ndjson", "csv")
+ROW_LEVELS = ("sessions", "turns")
+FETCH_SIZE = 1000            # Rows per server-side cursor fetch
+FLUSH_BYTES = 64 * 1024      # Emit output in ~64 KB chunks
+
+SESSION_FIELDS = [
+    "interview_id", "user_email", "created_at", "status", "job_description_id",
+    "soft_skill_score", "hard_skill_score", "final_verdict", "question_count",
+]
+TURN_FIELDS = [
+    "interview_id", "user_email", "created_at", "turn", "question", "answer", "feedback", "score",
+]
+
+
+def normalize_score(value) -> Optional[int]:
+    """'7/10', '7', 7 -> 7; anything unparseable (including inf/nan) -> None."""
+    if value is None:
+        return None
+    try:
+        return int(float(str(value).split("/")[0].strip()))
+    except (ValueError, OverflowError):
+        return None
+
+
+def accepts_gzip(accept_encoding: Optional[str]) -> bool:
+    """True if an Accept-Encoding header allows gzip: listed (or via '*') with q > 0."""
+    qvalues = {}
+    for part in (accept_encoding or "").lower().split(","):
+        coding, *params = [p.strip() for p in part.split(";")]
+        if not coding:
+            continue
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        qvalues[coding] = q
+    return qvalues.get("gzip", qvalues.get("*", 0.0)) > 0
+
+
+def _session_record(row):
+    feedback = row.feedback_json if isinstance(row.feedback_json, dict) else {}
+    summary = feedback.get("overall_summary", {})
+    summary = summary if isinstance(summary, dict) else {}
+    turns = feedback.get("question_analysis", [])
+    turns = turns if isinstance(turns, list) else []
+    return {
+        "interview_id": row.id,
+        "user_email": row.email,
+        "created_at": row.created_at.isoformat() if row.created_at else None,
+        "status": row.status,
+        "job_description_id": row.job_description_id,
+        "soft_skill_score": normalize_score(summary.get("soft_skill_score")),
+        "hard_skill_score": normalize_score(summary.get("hard_skill_score")),
+        "final_verdict": summary.get("final_verdict"),
+        "question_count": len(turns),
+    }, turns
+
+
+def iter_records(db, rows: str = "sessions", user_id: Optional[int] = None,
+                 since: Optional[datetime] = None, until: Optional[datetime] = None) -> Iterator[dict]:
+    """Yields one dict per interview (rows='sessions') or per analysed question (rows='turns')."""
+    stmt = (
+        select(Interview.id, Interview.created_at, Interview.status, Interview.job_description_id,
+               Interview.feedback_json, User.email)
+        .join(User, Interview.user_id == User.id)
+        .order_by(Interview.created_at, Interview.id)
+        # Server-side cursor on PostgreSQL; column tuples keep the ORM identity map empty
+        .execution_options(yield_per=FETCH_SIZE)
+    )
+    if user_id is not None:
+        stmt = stmt.where(Interview.user_id == user_id)
+    if since is not None:
+        stmt = stmt.where(Interview.created_at >= since)
+    if until is not None:
+        stmt = stmt.where(Interview.created_at < until)
+
+    for row in db.execute(stmt):
+        session, turns = _session_record(row)
+        if rows == "sessions":
+            yield session
+            continue
+        for idx, turn in enumerate(turns, 1):
+            if not isinstance(turn, dict):
+                continue
+            yield {
+                "interview_id": session["interview_id"],
+                "user_email": session["user_email"],
+                "created_at": session["created_at"],
+                "turn": idx,
+                "question": turn.get("question"),
+                "answer": turn.get("answer"),
+                "feedback": turn.get("feedback"),
+                "score": normalize_score(turn.get("score")),
+            }
+
+
+def iter_export(fmt: str = "ndjson", rows: str = "sessions", gzip: bool = False, **filters) -> Iterator[bytes]:
+    """
+    Yields the encoded export in ~FLUSH_BYTES chunks. Opens (and always closes) its own
+    DB session, so it can outlive the request's dependency-scoped session while streaming.
+    """
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if gzip else None  # wbits=31 -> gzip container
+    buffer = io.StringIO()
+    writer = None
+    if fmt == "csv":
+        writer = csv.DictWriter(buffer, fieldnames=SESSION_FIELDS if rows == "sessions" else TURN_FIELDS)
+        writer.writeheader()
+
+    def drain():
+        data = buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+        return compressor.compress(data) if compressor else data
+
+    db = SessionLocal()
+    count = 0
+    try:
+        for record in iter_records(db, rows=rows, **filters):
+            if writer:
+                writer.writerow(record)
+            else:
+                buffer.write(json.dumps(record, ensure_ascii=False) + "\n")
+            count += 1
+            if buffer.tell() >= FLUSH_BYTES:
+                chunk = drain()
+                if chunk:
+                    yield chunk
+        chunk = drain()
+        if compressor:
+            chunk += compressor.flush()
+        if chunk:
+            yield chunk
+        logger.info(f"Export finished: {count} {rows} as {fmt}{' (gzip)' if gzip else ''}")
+    finally:
+        db.close()
+
+
+# --- CLI ---
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream interview history out of the database.")
+    parser.add_argument("--format", choices=FORMATS, default="ndjson")
+    parser.add_argument("--rows", choices=ROW_LEVELS, default="sessions", help="One row per interview or per analysed question")
+    parser.add_argument("--user", help="Only this user's interviews (email)")
+    parser.add_argument("--since", type=datetime.fromisoformat, help="Inclusive start (ISO date/datetime)")
+    parser.add_argument("--until", type=datetime.fromisoformat, help="Exclusive end (ISO date/datetime)")
+    parser.add_argument("-o", "--output", help="Output file (default: stdout); a .gz suffix enables gzip")
+    args = parser.parse_args()
+
+    user_id = None
+    if args.user:
+        db = SessionLocal()
+        try:
+            user = db.query(User).filter(User.email == args.user).first()
+        finally:
+            db.close()
+        if user is None:
+            sys.exit(f"Unknown user: {args.user}")
+        user_id = user.id
+
+    gzip = bool(args.output and args.output.endswith(".gz"))
+    out = open(args.output, "wb") if args.output else sys.stdout.buffer
+    try:
+        for chunk in iter_export(args.format, args.rows, gzip=gzip, user_id=user_id, since=args.since, until=args.until):
+            out.write(chunk)
+    finally:
+        if args.output:
+            out.close()
+
+
+if __name__ == "__main__":
+    main()
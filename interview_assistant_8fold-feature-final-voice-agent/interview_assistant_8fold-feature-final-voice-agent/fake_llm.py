@@ -0,0 +1,238 @@
+import os
+import json
+import time
+import random
+import asyncio
+import hashlib
+import threading
+import logging
+from typing import Any, AsyncIterator, Iterator, List, Optional
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from pydantic import PrivateAttr
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# --- Canned Responses ---
+CRITIC_DECISIONS = [
+    "Hard|Strong answer, asking complex follow-up.",
+    "Easy|Probe for details.",
+    "Medium|Continue interview.",
+    "Easy|Offer a conceptual hint.",
+]
+
+INTERVIEWER_REPLIES = [
+    "Thanks for walking me through that. I see you used Python in your last project, could you be more specific about how you structured the services?",
+    "That makes sense. Suppose traffic grew tenfold overnight, what would you change first in the design you described?",
+    "Good point. Could you tell me about a time a deployment went wrong and how you handled the rollback?",
+    "No problem, here is a small hint: think about where the state lives. How would that change your answer?",
+]
+
+ROLE_RUBRIC = {
+    "role_title": "Backend Engineer",
+    "key_competencies": ["API design", "Databases", "Scalability", "Testing", "Incident response"],
+    "question_seeds": [
+        "Walk me through an API you designed",
+        "How do you choose between SQL and NoSQL",
+        "How would you scale a read-heavy service",
+        "How do you test asynchronous code",
+        "Describe an outage you debugged",
+        "How do you roll out a risky migration",
+    ],
+}
+
+
+class FakeLLMError(RuntimeError):
+    """Raised by FakeChatModel to simulate an upstream LLM failure."""
+
+
+class RecordingMissError(KeyError):
+    """Raised by RecordedChatModel when a prompt has no recorded response."""
+
+
+def prompt_key(messages: List[BaseMessage]) -> str:
+    """Stable hash of a prompt (message types + contents) used to index recordings."""
+    payload = json.dumps([[m.type, m.content] for m in messages], ensure_ascii=False)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    Deterministic offline chat model for load tests and simulations.
+    Output depends only on the prompt and seed; latency and failures are configurable.
+    Enable with LLM_PROVIDER=fake (see llm_utils.py).
+    """
+
+    token_latency_s: float = 0.0        # Delay between streamed tokens
+    first_token_latency_s: float = 0.0  # Extra delay before the first token
+    failure_rate: float = 0.0           # Probability [0, 1] that a call raises FakeLLMError
+    seed: int = 0
+    json_mode: bool = False             # Return feedback JSON (mirrors get_feedback_llm)
+
+    _rng: random.Random = PrivateAttr()
+    _rng_lock: threading.Lock = PrivateAttr()
+
+    def __init__(self, **kwargs: Any):
+        super().__init__(**kwargs)
+        self._rng = random.Random(self.seed)
+        self._rng_lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, **overrides: Any) -> "FakeChatModel":
+        params = {
+            "token_latency_s": float(os.getenv("FAKE_LLM_TOKEN_LATENCY_MS", "0")) / 1000,
+            "first_token_latency_s": float(os.getenv("FAKE_LLM_FIRST_TOKEN_LATENCY_MS", "0")) / 1000,
+            "failure_rate": float(os.getenv("FAKE_LLM_FAILURE_RATE", "0")),
+            "seed": int(os.getenv("FAKE_LLM_SEED", "0")),
+        }
+        params.update(overrides)
+        return cls(**params)
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat"
+
+    # --- Response Construction ---
+
+    def _respond(self, messages: List[BaseMessage]) -> str:
+        prompt = "\n".join(str(m.content) for m in messages)
+        digest = int(hashlib.sha256(f"{self.seed}:{prompt}".encode()).hexdigest(), 16)
+
+        if "preparing a ROLE RUBRIC" in prompt:  # generate_role_rubric; interviewer prompts embed the rubric too
+            return json.dumps(ROLE_RUBRIC)
+        if self.json_mode or "OUTPUT JSON" in prompt:
+            return json.dumps(self._feedback(digest))
+        if "DIFFICULTY|CRITIQUE" in prompt:
+            return CRITIC_DECISIONS[digest % len(CRITIC_DECISIONS)]
+        return INTERVIEWER_REPLIES[digest % len(INTERVIEWER_REPLIES)]
+
+    @staticmethod
+    def _feedback(digest: int) -> dict:
+        score = 4 + digest % 6
+        return {
+            "overall_summary": {
+                "strengths": ["Clear communication", "Relevant experience", "Structured answers"],
+                "weaknesses": ["Limited depth on scaling", "Few metrics", "Vague on testing"],
+                "final_verdict": "HIRE" if score >= 7 else "NO HIRE",
+                "soft_skill_score": f"{score}/10",
+                "hard_skill_score": f"{max(1, score - 1)}/10",
+            },
+            "question_analysis": [
+                {"question": "Project architecture", "answer": "Described services", "feedback": "Add specifics.", "score": score},
+            ],
+        }
+
+    @staticmethod
+    def _tokenize(text: str) -> List[str]:
+        words = text.split(" ")
+        return [w + " " for w in words[:-1]] + [words[-1]]
+
+    def _maybe_fail(self):
+        with self._rng_lock:
+            roll = self._rng.random()
+        if roll < self.failure_rate:
+            raise FakeLLMError("Simulated LLM failure")
+
+    # --- BaseChatModel Hooks ---
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        self._maybe_fail()
+        text = self._respond(messages)
+        time.sleep(self.first_token_latency_s + self.token_latency_s * len(self._tokenize(text)))
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=text))])
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                         run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        self._maybe_fail()
+        text = self._respond(messages)
+        await asyncio.sleep(self.first_token_latency_s + self.token_latency_s * len(self._tokenize(text)))
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=text))])
+
+    def _stream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                run_manager: Any = None, **kwargs: Any) -> Iterator[ChatGenerationChunk]:
+        self._maybe_fail()
+        time.sleep(self.first_token_latency_s)
+        for token in self._tokenize(self._respond(messages)):
+            time.sleep(self.token_latency_s)
+            yield ChatGenerationChunk(message=AIMessageChunk(content=token))
+
+    async def _astream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                       run_manager: Any = None, **kwargs: Any) -> AsyncIterator[ChatGenerationChunk]:
+        self._maybe_fail()
+        await asyncio.sleep(self.first_token_latency_s)
+        for token in self._tokenize(self._respond(messages)):
+            await asyncio.sleep(self.token_latency_s)
+            yield ChatGenerationChunk(message=AIMessageChunk(content=token))
+
+
+# Recordings loaded in this process: abspath -> (responses, write lock). get_feedback_llm()
+# builds a model per call, so re-parsing a large recording each time would dominate.
+_recordings = {}
+_recordings_lock = threading.Lock()
+
+def _load_recording(path: str):
+    path = os.path.abspath(path)
+    with _recordings_lock:
+        if path not in _recordings:
+            responses = {}
+            if os.path.exists(path):
+                with open(path, encoding="utf-8") as f:
+                    for line in f:
+                        if line.strip():
+                            entry = json.loads(line)
+                            responses[entry["key"]] = entry["response"]
+            _recordings[path] = (responses, threading.Lock())
+        return _recordings[path]
+
+
+class RecordedChatModel(BaseChatModel):
+    """
+    Replays LLM responses from an NDJSON recording ({"key": ..., "response": ...} per line),
+    keyed by prompt_key(). With `delegate` set, misses are answered by the delegate
+    (e.g. the live Gemini model) and appended to the recording.
+    Enable with LLM_PROVIDER=recorded and LLM_RECORDING=<path> (see llm_utils.py).
+    """
+
+    recording_path: str
+    delegate: Optional[BaseChatModel] = None
+
+    _responses: dict = PrivateAttr()
+    _write_lock: threading.Lock = PrivateAttr()
+
+    def __init__(self, **kwargs: Any):
+        super().__init__(**kwargs)
+        # Shared with every other model on the same recording in this process
+        self._responses, self._write_lock = _load_recording(self.recording_path)
+
+    @property
+    def _llm_type(self) -> str:
+        return "recorded-chat"
+
+    def _lookup(self, messages: List[BaseMessage]) -> str:
+        key = prompt_key(messages)
+        if key in self._responses:
+            return self._responses[key]
+        if self.delegate is None:
+            raise RecordingMissError(f"No recorded response for prompt {key[:12]}")
+
+        text = self.delegate.invoke(messages).content
+        with self._write_lock:
+            self._responses[key] = text
+            # Single-line O_APPEND writes keep concurrent recorders from interleaving
+            with open(self.recording_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps({"key": key, "response": text}, ensure_ascii=False) + "\n")
+        return text
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=self._lookup(messages)))])
+
+    async def _astream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                       run_manager: Any = None, **kwargs: Any) -> AsyncIterator[ChatGenerationChunk]:
+        text = await asyncio.to_thread(self._lookup, messages)
+        for token in FakeChatModel._tokenize(text):
+            yield ChatGenerationChunk(message=AIMessageChunk(content=token))
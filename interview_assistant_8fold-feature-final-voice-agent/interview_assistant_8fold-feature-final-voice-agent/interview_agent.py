@@ -3,25 +3,35 @@ from langchain_core.output_parsers.json import JsonOutputParser
 from langgraph.graph import StateGraph, END
 from langgraph.checkpoint.memory import MemorySaver
 from llm_utils import get_llm, get_feedback_llm
+from metrics import NodeTimer, StreamTimer, NODE_LATENCY, LIVE_SESSIONS, TURNS_ABANDONED, current_endpoint
 from typing import TypedDict, Annotated, List, Optional
+import asyncio
 import operator
+import threading
 import logging
-from pdf_generator import create_feedback_pdf
+import os
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# What to do with a streamed turn the client abandoned mid-answer:
+# "rollback" restores the state from before the user's message; "mark_incomplete"
+# keeps the partial reply, flagged with response_metadata={"incomplete": True}.
+DISCONNECT_POLICY = os.getenv("DISCONNECT_POLICY", "rollback").lower()
+
 # --- 1. The "Smart" State ---
 class InterviewAgentState(TypedDict):
     messages: Annotated[List, operator.add]
     job_description: Optional[str]
     resume: Optional[str]
+    rubric: Optional[dict]      # Precomputed role rubric shared by every session on the same JD
     
     # Internal Logic Variables (The "Brain" State)
     difficulty: str             # "Easy", "Medium", "Hard"
     critique: str               # The Critic's internal notes
     question_count: int
+    ended: bool                 # Set by the first end_interview call
 
 # --- 2. The Multi-Node Agent ---
 class InterviewAgent:
@@ -29,6 +39,7 @@ class InterviewAgent:
         self.llm = get_llm() 
         self.memory = MemorySaver()
         self.graph = self._build_graph()
+        self._end_lock = threading.Lock()  # end_interview runs in the threadpool; retries can overlap
 
     def _build_graph(self):
         graph = StateGraph(InterviewAgentState)
@@ -77,7 +88,8 @@ class InterviewAgent:
         
         # Non-streaming call for logic
         try:
-            response = self.llm.invoke([SystemMessage(content=prompt)])
+            with NodeTimer("critic"):
+                response = self.llm.invoke([SystemMessage(content=prompt)])
             content = response.content.strip()
             
             if "|" in content:
@@ -89,6 +101,20 @@ class InterviewAgent:
         except:
             return {"difficulty": "Medium", "critique": "Continue interview."}
 
+    @staticmethod
+    def _rubric_context(state: InterviewAgentState):
+        rubric = state.get('rubric') or {}
+        if not rubric:
+            return ""
+        competencies = ", ".join(rubric.get("key_competencies", [])[:8])
+        seeds = "\n".join(f"          * {q}" for q in rubric.get("question_seeds", [])[:6])
+        return f"""
+        ROLE RUBRIC:
+        - Key Competencies: {competencies}
+        - Question Seeds (adapt, don't read verbatim):
+{seeds}
+        """
+
     # --- NODE B: THE INTERVIEWER (The Voice) ---
     def _interviewer_node(self, state: InterviewAgentState):
         # Get context from state
@@ -96,6 +122,7 @@ class InterviewAgent:
         resume = state.get('resume', '')
         critique = state.get('critique', 'Continue')
         difficulty = state.get('difficulty', 'Medium')
+        rubric_context = self._rubric_context(state)
         
         # The Speaker's Prompt (Polite Persona)
         system_prompt = f"""
@@ -103,7 +130,7 @@ class InterviewAgent:
         CONTEXT: 
         - Job: {jd[:800]}...
         - Resume Highlights: {resume[:1000]}...
-        
+        {rubric_context}
         INTERNAL INSTRUCTION (FROM LOGIC ENGINE):
         - Assessment: {critique}
         - Target Difficulty: {difficulty}
@@ -120,13 +147,14 @@ class InterviewAgent:
         
         # Generate the actual speech
         # We pass the message history so conversation flows naturally
-        response = self.llm.invoke([SystemMessage(content=system_prompt)] + state["messages"])
+        with NodeTimer("interviewer"):
+            response = self.llm.invoke([SystemMessage(content=system_prompt)] + state["messages"])
         
         return {"messages": [response], "question_count": state.get("question_count", 0) + 1}
 
     # --- 3. Interface Methods ---
 
-    def start_interview(self, job_description, resume, session_id: str):
+    def start_interview(self, job_description, resume, session_id: str, rubric: Optional[dict] = None):
         config = {"configurable": {"thread_id": session_id}}
         
         # We inject a hidden "trigger" message to start the flow
@@ -134,13 +162,16 @@ class InterviewAgent:
             "messages": [HumanMessage(content="I am ready. Please introduce yourself.")],
             "job_description": job_description,
             "resume": resume,
+            "rubric": rubric,
             "difficulty": "Medium",
             "critique": "Start",
-            "question_count": 0
+            "question_count": 0,
+            "ended": False
         }
         
         # Run the graph (Critic -> Interviewer)
         result = self.graph.invoke(initial_state, config)
+        LIVE_SESSIONS.inc()
         
         # Return only the text content of the last message (The Interviewer's greeting)
         return result["messages"][-1].content
@@ -152,6 +183,9 @@ class InterviewAgent:
         """
         config = {"configurable": {"thread_id": session_id}}
 
+        # Checkpoint to roll back to if this turn is abandoned or fails
+        turn_start = self.graph.get_state(config).config
+
         # 1. Inject User Message into State
         self.graph.update_state(config, {"messages": [HumanMessage(content=user_message)]})
         
@@ -175,13 +209,14 @@ class InterviewAgent:
         resume = state.get('resume', '')
         critique = state.get('critique', 'Continue')
         difficulty = state.get('difficulty', 'Medium')
+        rubric_context = self._rubric_context(state)
         
         system_prompt = f"""
         IDENTITY: You are Alex, a Professional Technical Interviewer.
         CONTEXT: 
         - Job: {jd[:800]}...
         - Resume Highlights: {resume[:1000]}...
-        
+        {rubric_context}
         INTERNAL INSTRUCTION (FROM LOGIC ENGINE):
         - Assessment: {critique}
         - Target Difficulty: {difficulty}
@@ -197,20 +232,53 @@ class InterviewAgent:
         """
         
         full_response = ""
+        outcome = "complete"
+        timer = StreamTimer("interviewer_stream")
+        # DIRECT STREAM CALL (Guarantees tokens reach the frontend)
+        upstream = self.llm.astream([SystemMessage(content=system_prompt)] + state["messages"])
         try:
-            # DIRECT STREAM CALL (Guarantees tokens reach the frontend)
-            async for chunk in self.llm.astream([SystemMessage(content=system_prompt)] + state["messages"]):
+            async for chunk in upstream:
                 content = chunk.content
                 if content:
-                    yield content
+                    timer.token()
                     full_response += content
+                    yield content
+        except (asyncio.CancelledError, GeneratorExit):
+            # Client went away: stop the upstream LLM stream now rather than draining it
+            outcome = "disconnected"
+            raise
         except Exception as e:
             logger.error(f"Streaming Error: {e}")
+            timer.error()
+            outcome = "error"
             yield "I'm having trouble connecting. Could you repeat that?"
-            full_response = "Error."
+        finally:
+            await upstream.aclose()
+            timer.finish()
+            # 5. Finalize State
+            self._finalize_turn(config, turn_start, state, full_response, outcome)
+
+    def _finalize_turn(self, config, turn_start, state, full_response: str, outcome: str):
+        """
+        Commits the interviewer's reply, or undoes the turn so the session can be resumed cleanly.
+        """
+        question_count = state.get("question_count", 0) + 1
+
+        if outcome == "complete":
+            self.graph.update_state(config, {"messages": [AIMessage(content=full_response)], "question_count": question_count})
+            return
+
+        if outcome == "disconnected" and DISCONNECT_POLICY == "mark_incomplete" and full_response:
+            partial = AIMessage(content=full_response, response_metadata={"incomplete": True})
+            self.graph.update_state(config, {"messages": [partial], "question_count": question_count})
+            action = "mark_incomplete"
+        else:
+            # Fork from the pre-turn checkpoint: drops the user's message and the critic's update
+            self.graph.update_state(turn_start, None)
+            action = "rollback"
 
-        # 5. Finalize State
-        self.graph.update_state(config, {"messages": [AIMessage(content=full_response)], "question_count": state.get("question_count", 0) + 1})
+        TURNS_ABANDONED.labels(reason=outcome, action=action).inc()
+        logger.info(f"Turn {outcome} for session {config['configurable']['thread_id']}: {action}")
 
     def interact(self, user_message: str, session_id: str):
         """
@@ -224,19 +292,55 @@ class InterviewAgent:
         
         return result["messages"][-1].content
 
+    def generate_role_rubric(self, job_description: str):
+        """
+        One-off LLM call that distills a JD into competencies and question seeds.
+        Cached per JD by jd_library, so it runs once per distinct job description.
+        """
+        prompt = f"""
+        You are an Expert Technical Recruiter preparing a ROLE RUBRIC.
+        JOB DESCRIPTION: {job_description[:4000]}
+
+        OUTPUT JSON:
+        {{
+            "role_title": "Short title",
+            "key_competencies": ["List 5-8 skills the interview must cover"],
+            "question_seeds": ["List 6 interview question starters tied to the competencies"]
+        }}
+        """
+        chain = get_feedback_llm() | JsonOutputParser()
+        with NodeTimer("rubric_llm"):
+            rubric = chain.invoke(prompt)
+        if not isinstance(rubric, dict):
+            raise ValueError("Rubric generation returned non-object JSON")
+        return rubric
+
+    def _mark_ended(self, config):
+        """Counts the session as no longer live, once, however often /end_interview is retried."""
+        with self._end_lock:
+            if self.graph.get_state(config).values.get("ended"):
+                return
+            self.graph.update_state(config, {"ended": True})
+        LIVE_SESSIONS.dec()
+
     def end_interview(self, session_id: str):
         config = {"configurable": {"thread_id": session_id}}
         state_values = self.graph.get_state(config).values
         
         if not state_values:
             return None, {"error": "Session not found"}
+        self._mark_ended(config)
 
         job_desc = state_values.get('job_description', "General Role")
         messages = state_values.get('messages', [])
         
         # Clean Transcript (Remove System messages)
         transcript = [msg for msg in messages if not isinstance(msg, SystemMessage) and "I am ready" not in msg.content]
-        transcript_str = "\n".join([f"{'Alex' if isinstance(m, AIMessage) else 'Candidate'}: {m.content}" for m in transcript])
+        transcript_str = "\n".join([
+            f"{'Alex' if isinstance(m, AIMessage) else 'Candidate'}: {m.content}"
+            + (" [cut off]" if getattr(m, "response_metadata", {}).get("incomplete") else "")
+            for m in transcript
+        ])
 
         # Default fallback
         feedback_json = {
@@ -268,14 +372,17 @@ class InterviewAgent:
                 ]
             }}
             """
-            generated = chain.invoke(prompt)
+            with NodeTimer("feedback_llm"):
+                generated = chain.invoke(prompt)
             if generated: feedback_json = generated
             
         except Exception as e:
             logger.error(f"Feedback Gen Error: {e}")
 
         try:
-            pdf_path = create_feedback_pdf(session_id, transcript, feedback_json)
-            return pdf_path, feedback_json
+            from pdf_generator import create_feedback_pdf  # fpdf is only needed here
+            with NODE_LATENCY.labels(endpoint=current_endpoint.get(), node="pdf_render").time():
+                report_key = create_feedback_pdf(session_id, transcript, feedback_json)
+            return report_key, feedback_json
         except Exception as e:
             return None, {"error": str(e)}
\ No newline at end of file
@@ -0,0 +1,123 @@
+import os
+import re
+import time
+import hashlib
+import threading
+import unicodedata
+import logging
+from collections import OrderedDict
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from models import JobDescription
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Recruiters reuse a handful of JDs, so a small per-process cache covers almost every session
+RUBRIC_CACHE_SIZE = 256
+# After a failed generation, sessions on that JD start without a rubric for this long
+RUBRIC_RETRY_SECONDS = float(os.getenv("RUBRIC_RETRY_SECONDS", "300"))
+
+_rubric_cache = OrderedDict()   # jd_id -> rubric dict
+_cache_lock = threading.Lock()
+_failed_until = {}              # jd_id -> monotonic time before which generation is not retried
+_generation_locks = {}          # jd_id -> Lock, so concurrent sessions on a new JD generate once
+_generation_locks_lock = threading.Lock()
+
+
+def normalize_job_description(text: str) -> str:
+    """Canonical form used for hashing: NFKC, lowercase, collapsed whitespace."""
+    text = unicodedata.normalize("NFKC", text or "")
+    return re.sub(r"\s+", " ", text).strip().lower()
+
+def job_description_id(text: str) -> str:
+    return hashlib.sha256(normalize_job_description(text).encode("utf-8")).hexdigest()
+
+
+def _cache_get(jd_id):
+    with _cache_lock:
+        if jd_id in _rubric_cache:
+            _rubric_cache.move_to_end(jd_id)
+            return _rubric_cache[jd_id]
+    return None
+
+def _cache_put(jd_id, rubric):
+    with _cache_lock:
+        _failed_until.pop(jd_id, None)
+        _rubric_cache[jd_id] = rubric
+        _rubric_cache.move_to_end(jd_id)
+        while len(_rubric_cache) > RUBRIC_CACHE_SIZE:
+            _rubric_cache.popitem(last=False)
+
+def _recently_failed(jd_id):
+    with _cache_lock:
+        until = _failed_until.get(jd_id)
+        if until is not None and time.monotonic() >= until:
+            del _failed_until[jd_id]
+            return False
+        return until is not None
+
+def _mark_failed(jd_id):
+    with _cache_lock:
+        _failed_until[jd_id] = time.monotonic() + RUBRIC_RETRY_SECONDS
+
+
+def get_or_create_job_description(db: Session, text: str) -> JobDescription:
+    jd_id = job_description_id(text)
+    job = db.get(JobDescription, jd_id)
+    if job:
+        return job
+
+    job = JobDescription(id=jd_id, text=text.strip())
+    db.add(job)
+    try:
+        db.commit()
+    except IntegrityError:
+        # Another worker inserted the same JD first
+        db.rollback()
+        job = db.get(JobDescription, jd_id)
+    return job
+
+
+def resolve_job_description(db: Session, text: str, generate_rubric):
+    """
+    Returns (jd_id, rubric) for a JD, creating the library row and its rubric on first sight.
+    `generate_rubric(text) -> dict` is only called when no rubric is stored yet. It blocks,
+    so call this off the event loop. A failed generation returns rubric=None, and later
+    sessions on that JD skip generation until RUBRIC_RETRY_SECONDS have passed.
+    """
+    jd_id = job_description_id(text)
+    rubric = _cache_get(jd_id)
+    if rubric is not None:
+        return jd_id, rubric  # Row exists: it was created before the rubric was cached
+
+    job = get_or_create_job_description(db, text)
+    if job.rubric_json:
+        _cache_put(jd_id, job.rubric_json)
+        return jd_id, job.rubric_json
+    if _recently_failed(jd_id):
+        return jd_id, None
+
+    with _generation_locks_lock:
+        lock = _generation_locks.setdefault(jd_id, threading.Lock())
+    with lock:
+        # Whoever held the lock before us has filled the cache (or marked the JD failed)
+        rubric = _cache_get(jd_id)
+        if rubric is not None or _recently_failed(jd_id):
+            return jd_id, rubric
+        try:
+            rubric = generate_rubric(job.text)
+            job.rubric_json = rubric
+            db.commit()
+        except Exception as e:
+            logger.error(f"Rubric generation failed for JD {jd_id[:12]}: {e}")
+            db.rollback()
+            _mark_failed(jd_id)
+            rubric = None
+        else:
+            _cache_put(jd_id, rubric)
+        # Only dropped once the outcome is cached, so late arrivals can't start a second generation
+        with _generation_locks_lock:
+            _generation_locks.pop(jd_id, None)
+        return jd_id, rubric
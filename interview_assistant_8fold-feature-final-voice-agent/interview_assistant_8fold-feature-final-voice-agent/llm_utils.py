@@ -1,22 +1,48 @@
 import os
-from langchain_google_genai import ChatGoogleGenerativeAI
-from google.generativeai.types.safety_types import HarmBlockThreshold, HarmCategory
 import logging
+from functools import lru_cache
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# "gemini" (default), "fake" (deterministic offline model) or "recorded" (replay), see fake_llm.py
+LLM_PROVIDER = os.getenv("LLM_PROVIDER", "gemini").lower()
+# For "recorded": NDJSON recording to replay, and whether misses go to Gemini and get recorded
+LLM_RECORDING = os.getenv("LLM_RECORDING", "llm_recording.ndjson")
+LLM_RECORD_MISSES = os.getenv("LLM_RECORD_MISSES", "false").lower() == "true"
+
+def _recorded(live_factory):
+    from fake_llm import RecordedChatModel
+    delegate = live_factory() if LLM_RECORD_MISSES else None
+    return RecordedChatModel(recording_path=LLM_RECORDING, delegate=delegate)
+
+@lru_cache(maxsize=None)
+def _fake(json_mode=False):
+    # One instance per mode, so callers that fetch a model per request (get_feedback_llm)
+    # share a single RNG stream and FAKE_LLM_FAILURE_RATE actually mixes failures in
+    from fake_llm import FakeChatModel
+    return FakeChatModel.from_env(json_mode=json_mode)
+
 def get_llm(temperature=0.7):
     """
-    Returns a Gemini 2.0 instance.
+    Returns a Gemini 2.0 instance (or the offline fake/replay model, see LLM_PROVIDER).
     """
+    if LLM_PROVIDER == "fake":
+        return _fake()
+    if LLM_PROVIDER == "recorded":
+        return _recorded(lambda: _gemini_llm(temperature))
+    return _gemini_llm(temperature)
+
+def _gemini_llm(temperature):
+    from langchain_google_genai import ChatGoogleGenerativeAI
+
     api_key = os.getenv("GOOGLE_API_KEY")
     if not api_key:
         raise ValueError("FATAL: GOOGLE_API_KEY is not set.")
 
     return ChatGoogleGenerativeAI(
-        model="gemini-2.0-flash-lite", 
+        model="gemini-2.0-flash-lite",
         google_api_key=api_key,
         temperature=temperature,
         max_retries=5,
@@ -25,11 +51,21 @@ def get_llm(temperature=0.7):
 
 def get_feedback_llm():
     """
-    Specific instance for JSON feedback. 
+    Specific instance for JSON feedback.
     INCLUDES SAFETY SETTINGS TO PREVENT EMPTY RESPONSES.
     """
+    if LLM_PROVIDER == "fake":
+        return _fake(json_mode=True)
+    if LLM_PROVIDER == "recorded":
+        return _recorded(_gemini_feedback_llm)
+    return _gemini_feedback_llm()
+
+def _gemini_feedback_llm():
+    from langchain_google_genai import ChatGoogleGenerativeAI
+    from google.generativeai.types.safety_types import HarmBlockThreshold, HarmCategory
+
     api_key = os.getenv("GOOGLE_API_KEY")
-    
+
     # Disable safety filters so it doesn't block the feedback generation
     safety_settings = {
         HarmCategory.HARM_CATEGORY_HARASSMENT: HarmBlockThreshold.BLOCK_NONE,
@@ -37,13 +73,13 @@ def get_feedback_llm():
         HarmCategory.HARM_CATEGORY_SEXUALLY_EXPLICIT: HarmBlockThreshold.BLOCK_NONE,
         HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT: HarmBlockThreshold.BLOCK_NONE,
     }
-    
+
     return ChatGoogleGenerativeAI(
-        model="gemini-2.0-flash-lite", 
+        model="gemini-2.0-flash-lite",
         google_api_key=api_key,
-        temperature=0.1,    
-        max_retries=10,     
+        temperature=0.1,
+        max_retries=10,
         request_timeout=90,
         safety_settings=safety_settings, # <--- ADDED THIS
         generation_config={"response_mime_type": "application/json"}
-    )
\ No newline at end of file
+    )
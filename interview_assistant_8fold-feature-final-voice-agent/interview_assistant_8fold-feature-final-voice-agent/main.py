@@ -1,23 +1,34 @@
-from fastapi import FastAPI, File, UploadFile, Form, HTTPException, Depends, status
+from fastapi import FastAPI, File, UploadFile, Form, HTTPException, Depends, Query, Request, status
 from pydantic import BaseModel
 from dotenv import load_dotenv
-from interview_agent import InterviewAgent
-from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
+from fastapi.responses import Response, JSONResponse, PlainTextResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import OAuth2PasswordRequestForm
+from contextlib import asynccontextmanager
+import asyncio
 import io
-from pypdf import PdfReader
+import os
 import uuid
 import logging
+import threading
+from sqlalchemy import func, text
 from sqlalchemy.orm import Session
 from typing import Optional
 import json
 
 # --- New Imports for Auth & DB ---
-from database import engine, get_db, Base
+from database import engine, get_db, init_db
 from models import User, Interview
-from auth import get_password_hash, verify_password, create_access_token, get_current_user, ACCESS_TOKEN_EXPIRE_MINUTES
-from datetime import timedelta
+from jd_library import resolve_job_description
+from export import iter_export, accepts_gzip, FORMATS, ROW_LEVELS
+from auth import get_password_hash, verify_password, create_access_token, get_current_user, get_current_admin, ACCESS_TOKEN_EXPIRE_MINUTES, ADMIN_EMAILS
+from report_store import get_report_store
+from metrics import MetricsMiddleware, PDF_PARSE_LATENCY, instrument_engine, render_latest
+from profiler import profiler, ProfilerBusy, LoopLagMonitor, PROFILING_ENABLED, LOOP_LAG_THRESHOLD_MS, MAX_PROFILE_SECONDS
+from datetime import datetime, timedelta
+
+# NOTE: LangChain/LangGraph/Gemini (via interview_agent) and pypdf are imported lazily.
+# Keep heavy imports out of module scope - benchmarks/import_time.py enforces this.
 
 # Load environment variables
 load_dotenv()
@@ -26,10 +37,64 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# --- Create Tables on Startup ---
-Base.metadata.create_all(bind=engine)
+# --- Startup Configuration ---
+CREATE_SCHEMA_ON_STARTUP = os.getenv("CREATE_SCHEMA_ON_STARTUP", "true").lower() == "true"
+WARM_AGENT_ON_STARTUP = os.getenv("WARM_AGENT_ON_STARTUP", "false").lower() == "true"
+
+# --- Global Agent Instance (created on first use) ---
+_agent = None
+_agent_lock = threading.Lock()
+
+def get_agent():
+    global _agent
+    if _agent is None:
+        with _agent_lock:
+            if _agent is None:
+                from interview_agent import InterviewAgent
+                _agent = InterviewAgent()
+    return _agent
+
+# --- Startup State (read by /readyz) ---
+startup_state = {"schema_ready": False, "agent_ready": False, "startup_complete": False}
+
+async def _warm_agent():
+    try:
+        await asyncio.to_thread(get_agent)
+        startup_state["agent_ready"] = True
+        logger.info("Interview agent warmed up.")
+    except Exception as e:
+        logger.error(f"Agent warm-up failed: {e}")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 1. Schema creation is an explicit step; disable it when migrations run out-of-band
+    if CREATE_SCHEMA_ON_STARTUP:
+        await asyncio.to_thread(init_db)
+    startup_state["schema_ready"] = True
+
+    # 2. Optionally build the agent in the background so the worker accepts traffic immediately
+    warm_task = asyncio.create_task(_warm_agent()) if WARM_AGENT_ON_STARTUP else None
+
+    # 3. Event-loop lag monitor (only when LOOP_LAG_THRESHOLD_MS is set)
+    lag_monitor = None
+    if LOOP_LAG_THRESHOLD_MS > 0:
+        lag_monitor = LoopLagMonitor(LOOP_LAG_THRESHOLD_MS)
+        lag_monitor.start()
+
+    startup_state["startup_complete"] = True
+    yield
 
-app = FastAPI()
+    startup_state["startup_complete"] = False
+    if warm_task and not warm_task.done():
+        warm_task.cancel()
+    if lag_monitor:
+        await lag_monitor.stop()
+
+app = FastAPI(lifespan=lifespan)
+
+# --- Metrics ---
+instrument_engine(engine)
+app.add_middleware(MetricsMiddleware)
 
 # --- CORS Middleware ---
 app.add_middleware(
@@ -40,9 +105,6 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# --- Global Agent Instance ---
-agent = InterviewAgent()
-
 # --- Pydantic Models ---
 class UserResponse(BaseModel):
     session_id: str
@@ -59,6 +121,63 @@ class Token(BaseModel):
     access_token: str
     token_type: str
 
+# --- HEALTH ENDPOINTS ---
+
+@app.get("/healthz")
+def healthz():
+    """Liveness: the process is up and serving requests."""
+    return {"status": "ok"}
+
+@app.get("/readyz")
+def readyz():
+    """Readiness: startup finished and the database is reachable."""
+    checks = {
+        "startup": startup_state["startup_complete"],
+        "schema": startup_state["schema_ready"],
+        "database": False,
+    }
+    if WARM_AGENT_ON_STARTUP:
+        checks["agent"] = startup_state["agent_ready"]
+
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+        checks["database"] = True
+    except Exception as e:
+        logger.error(f"Readiness DB check failed: {e}")
+
+    ready = all(checks.values())
+    return JSONResponse(
+        status_code=status.HTTP_200_OK if ready else status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"status": "ready" if ready else "not_ready", "checks": checks}
+    )
+
+@app.get("/metrics")
+def metrics():
+    """Prometheus scrape endpoint."""
+    body, content_type = render_latest()
+    return Response(content=body, media_type=content_type)
+
+# --- ADMIN ENDPOINTS ---
+
+def require_profiling_enabled():
+    # Route-level dependency: resolved before auth, so a disabled profiler is a plain 404 for everyone
+    if not PROFILING_ENABLED:
+        raise HTTPException(status_code=404, detail="Not Found")
+
+@app.get("/admin/profile", response_class=PlainTextResponse, dependencies=[Depends(require_profiling_enabled)])
+def profile(seconds: float = 10, interval_ms: float = 5, admin: User = Depends(get_current_admin)):
+    """
+    Samples all threads of this worker for `seconds` (max 60) and returns
+    collapsed stacks (`thread;frame;frame count`) for flamegraph.pl / speedscope.
+    """
+    if seconds > MAX_PROFILE_SECONDS:
+        raise HTTPException(status_code=400, detail=f"seconds must be <= {MAX_PROFILE_SECONDS}")
+    try:
+        return profiler.profile(seconds, interval_ms)
+    except ProfilerBusy as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
 # --- AUTH ENDPOINTS ---
 
 @app.post("/register", response_model=Token)
@@ -95,6 +214,12 @@ def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depend
 
 # --- INTERVIEW ENDPOINTS ---
 
+def _begin_session(db: Session, job_description: str, resume_text: str, session_id: str):
+    agent = get_agent()
+    # Deduplicated JD + role rubric, computed once per distinct JD and reused across sessions
+    jd_id, rubric = resolve_job_description(db, job_description, agent.generate_role_rubric)
+    return jd_id, agent.start_interview(job_description, resume_text, session_id, rubric=rubric)
+
 @app.post("/start_interview")
 async def start_interview(
     job_description: str = Form(...), 
@@ -106,24 +231,26 @@ async def start_interview(
     
     # 1. Parse Resume PDF
     try:
+        from pypdf import PdfReader
         resume_content = await resume.read()
-        pdf_stream = io.BytesIO(resume_content)
-        reader = PdfReader(pdf_stream)
-        resume_text = ""
-        for page in reader.pages:
-            resume_text += page.extract_text() or ""
+        with PDF_PARSE_LATENCY.labels(endpoint="/start_interview").time():
+            pdf_stream = io.BytesIO(resume_content)
+            reader = PdfReader(pdf_stream)
+            resume_text = ""
+            for page in reader.pages:
+                resume_text += page.extract_text() or ""
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Invalid PDF: {str(e)}")
 
-    # 2. Start Agent
+    # 2. Start Agent (blocking LLM calls, so off the event loop)
     try:
-        welcome_message = agent.start_interview(job_description, resume_text, session_id)
+        jd_id, welcome_message = await asyncio.to_thread(_begin_session, db, job_description, resume_text, session_id)
         
         # 3. Create Interview Record in DB
         new_interview = Interview(
             id=session_id,
             user_id=current_user.id,
-            job_description=job_description,
+            job_description_id=jd_id,
             status="IN_PROGRESS",
             feedback_json={} # Empty initially
         )
@@ -142,26 +269,36 @@ async def start_interview(
 def interview(payload: UserResponse):
     """Standard non-streaming interaction."""
     try:
-        ai_message = agent.interact(payload.response, payload.session_id)
+        ai_message = get_agent().interact(payload.response, payload.session_id)
         return {"message": ai_message}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/stream_interview")
-async def stream_interview(payload: UserResponse):
+async def stream_interview(payload: UserResponse, request: Request):
     """Streaming interaction for real-time text effect."""
+    agent = get_agent()
+
     async def text_stream():
-        async for chunk in agent.stream_interact(payload.response, payload.session_id):
-            if chunk:
-                yield chunk
+        turn = agent.stream_interact(payload.response, payload.session_id)
+        try:
+            async for chunk in turn:
+                if await request.is_disconnected():
+                    logger.info(f"Client disconnected mid-turn: {payload.session_id}")
+                    break
+                if chunk:
+                    yield chunk
+        finally:
+            # Cancels the upstream LLM stream and rolls back / marks the turn right away
+            await turn.aclose()
 
     return StreamingResponse(text_stream(), media_type="text/plain")
 
 @app.post("/end_interview")
 def end_interview(payload: EndInterviewRequest, db: Session = Depends(get_db)):
     try:
-        # Agent returns path to PDF and the raw JSON data
-        pdf_path, feedback_data = agent.end_interview(payload.session_id)
+        # Agent returns the report store key of the PDF and the raw JSON data
+        report_key, feedback_data = get_agent().end_interview(payload.session_id)
         
         # Update DB with results
         interview_record = db.query(Interview).filter(Interview.id == payload.session_id).first()
@@ -177,11 +314,11 @@ def end_interview(payload: EndInterviewRequest, db: Session = Depends(get_db)):
             interview_record.feedback_json = feedback_data
             db.commit()
         
-        if pdf_path:
-            return FileResponse(
-                path=pdf_path, 
-                media_type='application/pdf', 
-                filename=f"feedback_report_{payload.session_id}.pdf"
+        if report_key:
+            return Response(
+                content=get_report_store().get(report_key),
+                media_type='application/pdf',
+                headers={"Content-Disposition": f'attachment; filename="feedback_report_{payload.session_id}.pdf"'}
             )
         else:
             return JSONResponse(content={"feedback": feedback_data, "warning": "PDF generation failed"})
@@ -195,7 +332,8 @@ def get_analytics(current_user: User = Depends(get_current_user), db: Session =
     """
     Aggregates interview data for the dashboard.
     """
-    interviews = db.query(Interview).filter(Interview.user_id == current_user.id).all()
+    # Only the columns the dashboard needs; JD text lives in job_descriptions
+    interviews = db.query(Interview.created_at, Interview.feedback_json).filter(Interview.user_id == current_user.id).all()
     
     history = []
     total_score = 0
@@ -230,6 +368,51 @@ def get_analytics(current_user: User = Depends(get_current_user), db: Session =
         "total_sessions": count
     }
 
+@app.get("/export")
+def export_interviews(
+    request: Request,
+    fmt: str = Query("ndjson", alias="format"),
+    rows: str = "sessions",
+    user: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Streams interviews (or per-question turn rows) with normalized scores as NDJSON or CSV.
+    Users export their own history; admins may export everyone's or filter by `user` email.
+    """
+    if fmt not in FORMATS or rows not in ROW_LEVELS:
+        raise HTTPException(status_code=400, detail=f"format must be one of {FORMATS}, rows one of {ROW_LEVELS}")
+
+    is_admin = current_user.email.lower() in ADMIN_EMAILS
+    if user is None:
+        user_id = None if is_admin else current_user.id
+    elif user.lower() == current_user.email.lower():
+        user_id = current_user.id
+    elif is_admin:
+        target = db.query(User).filter(func.lower(User.email) == user.lower()).first()
+        if not target:
+            raise HTTPException(status_code=404, detail="User not found")
+        user_id = target.id
+    else:
+        raise HTTPException(status_code=403, detail="Admin privileges required")
+
+    use_gzip = accepts_gzip(request.headers.get("accept-encoding"))
+    headers = {
+        "Content-Disposition": f'attachment; filename="interviews_{rows}.{fmt}"',
+        "Vary": "Accept-Encoding",
+    }
+    if use_gzip:
+        headers["Content-Encoding"] = "gzip"
+
+    return StreamingResponse(
+        iter_export(fmt, rows, gzip=use_gzip, user_id=user_id, since=since, until=until),
+        media_type="application/x-ndjson" if fmt == "ndjson" else "text/csv",
+        headers=headers
+    )
+
 @app.post("/reset")
 def reset():
     return {"message": "Session reset."}
@@ -0,0 +1,233 @@
+import os
+import time
+import logging
+from contextvars import ContextVar
+from prometheus_client import (
+    CollectorRegistry, Counter, Gauge, Histogram,
+    CONTENT_TYPE_LATEST, REGISTRY, generate_latest,
+)
+from sqlalchemy import event
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Endpoint label for work done on behalf of the current request (set by the HTTP middleware)
+current_endpoint: ContextVar[str] = ContextVar("current_endpoint", default="none")
+
+# LLM calls range from sub-second critic decisions to long feedback generations
+LLM_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2, 4, 8, 15, 30, 60, 120)
+FAST_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+
+# --- HTTP ---
+HTTP_REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds", "HTTP request latency, including the full (streamed) body.",
+    ["endpoint", "method", "status"], buckets=LLM_BUCKETS,
+)
+
+# --- Agent Nodes / LLM ---
+NODE_LATENCY = Histogram(
+    "agent_node_duration_seconds", "Latency of agent graph nodes and LLM stages.",
+    ["endpoint", "node"], buckets=LLM_BUCKETS,
+)
+LLM_ERRORS = Counter(
+    "llm_errors_total", "LLM calls that raised.",
+    ["endpoint", "node"],
+)
+STREAM_TTFT = Histogram(
+    "llm_stream_time_to_first_token_seconds", "Time from stream start to the first streamed token.",
+    ["endpoint", "node"], buckets=LLM_BUCKETS,
+)
+STREAM_TOKENS_PER_SECOND = Histogram(
+    "llm_stream_tokens_per_second", "Streaming throughput per response (chunks per second after the first token).",
+    ["endpoint", "node"], buckets=(1, 5, 10, 20, 40, 80, 160, 320),
+)
+STREAM_TOKENS = Counter(
+    "llm_stream_tokens_total", "Streamed chunks emitted by the LLM.",
+    ["endpoint", "node"],
+)
+TURNS_ABANDONED = Counter(
+    "interview_turns_abandoned_total", "Streamed turns that did not complete (client disconnect or LLM error).",
+    ["reason", "action"],
+)
+
+# --- Other Work ---
+PDF_PARSE_LATENCY = Histogram(
+    "resume_pdf_parse_duration_seconds", "Time to extract text from an uploaded resume PDF.",
+    ["endpoint"], buckets=FAST_BUCKETS,
+)
+DB_LATENCY = Histogram(
+    "db_query_duration_seconds", "Database statement latency.",
+    ["endpoint", "operation"], buckets=FAST_BUCKETS,
+)
+EVENT_LOOP_LAG = Histogram(
+    "event_loop_lag_seconds", "Event-loop scheduling delay (only recorded while the lag monitor is enabled).",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+
+# --- Report Store ---
+REPORT_PUTS = Counter(
+    "report_store_puts_total", "Reports handed to the report store.",
+    ["result"],  # "written" or "dedup"
+)
+REPORT_BYTES = Counter(
+    "report_store_bytes_total", "Report bytes for newly written reports, before and after compression.",
+    ["stage"],  # "uncompressed" or "compressed"
+)
+REPORT_GET_MISSES = Counter(
+    "report_store_get_misses_total", "Report reads for keys that are no longer stored.",
+)
+REPORT_EVICTIONS = Counter(
+    "report_store_evicted_files_total", "Reports removed by retention sweeps.",
+    ["reason"],  # "age", "size" or "stale_tmp"
+)
+REPORT_EVICTED_BYTES = Counter(
+    "report_store_evicted_bytes_total", "Compressed bytes removed by retention sweeps.",
+)
+# The store is shared by all workers, so the most recent sweep's view is the right one
+REPORT_DISK_BYTES = Gauge(
+    "report_store_disk_bytes", "Compressed report bytes on disk as of the last retention sweep.",
+    multiprocess_mode="mostrecent",
+)
+REPORT_FILES = Gauge(
+    "report_store_files", "Stored reports as of the last retention sweep.",
+    multiprocess_mode="mostrecent",
+)
+
+# --- Gauges ---
+# "livesum" sums across workers when PROMETHEUS_MULTIPROC_DIR is set
+LIVE_SESSIONS = Gauge(
+    "interview_live_sessions", "Interview sessions started and not yet ended in this process.",
+    multiprocess_mode="livesum",
+)
+LLM_INFLIGHT = Gauge(
+    "llm_inflight_calls", "LLM calls currently in progress.",
+    multiprocess_mode="livesum",
+)
+
+
+# --- Helpers ---
+
+class NodeTimer:
+    """Context manager timing an LLM-backed stage: latency histogram, in-flight gauge, error counter."""
+
+    def __init__(self, node: str):
+        self.node = node
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        LLM_INFLIGHT.inc()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        LLM_INFLIGHT.dec()
+        endpoint = current_endpoint.get()
+        NODE_LATENCY.labels(endpoint=endpoint, node=self.node).observe(time.perf_counter() - self.start)
+        if exc_type is not None:
+            LLM_ERRORS.labels(endpoint=endpoint, node=self.node).inc()
+        return False
+
+
+class StreamTimer:
+    """Records time-to-first-token and tokens/sec for a streamed LLM response."""
+
+    def __init__(self, node: str):
+        self.node = node
+        self.endpoint = current_endpoint.get()
+        self.start = time.perf_counter()
+        self.first_token_at = None
+        self.tokens = 0
+        LLM_INFLIGHT.inc()
+
+    def token(self):
+        if self.first_token_at is None:
+            self.first_token_at = time.perf_counter()
+            STREAM_TTFT.labels(endpoint=self.endpoint, node=self.node).observe(self.first_token_at - self.start)
+        self.tokens += 1
+
+    def error(self):
+        LLM_ERRORS.labels(endpoint=self.endpoint, node=self.node).inc()
+
+    def finish(self):
+        LLM_INFLIGHT.dec()
+        end = time.perf_counter()
+        NODE_LATENCY.labels(endpoint=self.endpoint, node=self.node).observe(end - self.start)
+        STREAM_TOKENS.labels(endpoint=self.endpoint, node=self.node).inc(self.tokens)
+        if self.first_token_at is not None and self.tokens > 1 and end > self.first_token_at:
+            rate = (self.tokens - 1) / (end - self.first_token_at)
+            STREAM_TOKENS_PER_SECOND.labels(endpoint=self.endpoint, node=self.node).observe(rate)
+
+
+def instrument_engine(engine):
+    """Times every statement executed through the SQLAlchemy engine."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get("query_start")
+        if not starts:
+            return
+        operation = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "OTHER"
+        DB_LATENCY.labels(endpoint=current_endpoint.get(), operation=operation).observe(time.perf_counter() - starts.pop())
+
+    @event.listens_for(engine, "handle_error")
+    def _error(context):
+        # Keep the start stack balanced when a statement fails
+        starts = context.connection.info.get("query_start") if context.connection is not None else None
+        if starts:
+            starts.pop()
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware: times each request through the last body chunk and
+    tags work done on its behalf (nodes, DB calls) with the endpoint label.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._known_paths = None
+
+    def _endpoint(self, scope):
+        # Label by route path only; unknown paths collapse to one label to bound cardinality
+        if self._known_paths is None:
+            self._known_paths = {getattr(r, "path", None) for r in scope["app"].routes}
+        path = scope.get("path", "")
+        return path if path in self._known_paths else "unmatched"
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        endpoint = self._endpoint(scope)
+        token = current_endpoint.set(endpoint)
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_REQUEST_LATENCY.labels(
+                endpoint=endpoint, method=scope["method"], status=str(status_code)
+            ).observe(time.perf_counter() - start)
+            current_endpoint.reset(token)
+
+
+def render_latest():
+    """Returns (body, content_type) in Prometheus text format, aggregating workers when multiprocess mode is on."""
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
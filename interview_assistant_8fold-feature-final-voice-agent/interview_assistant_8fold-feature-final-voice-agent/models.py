@@ -14,13 +14,24 @@ class User(Base):
     # Relationship
     interviews = relationship("Interview", back_populates="owner")
 
+class JobDescription(Base):
+    __tablename__ = "job_descriptions"
+
+    id = Column(String(64), primary_key=True)   # SHA-256 of the normalized text (see jd_library.py)
+    text = Column(Text)
+    rubric_json = Column(JSON, nullable=True)   # Precomputed role rubric, generated once per JD
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    interviews = relationship("Interview", back_populates="job")
+
 class Interview(Base):
     __tablename__ = "interviews"
 
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     user_id = Column(Integer, ForeignKey("users.id"))
     
-    job_description = Column(Text)
+    job_description_id = Column(String(64), ForeignKey("job_descriptions.id"), nullable=True, index=True)
+    job_description = Column(Text)  # Legacy: full JD text, only set on rows created before job_descriptions
     transcript = Column(Text)       # Full conversation text
     feedback_json = Column(JSON)    # The structured analysis
     status = Column(String, default="IN_PROGRESS") # Added status
@@ -28,3 +39,4 @@ class Interview(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
 
     owner = relationship("User", back_populates="interviews")
+    job = relationship("JobDescription", back_populates="interviews")
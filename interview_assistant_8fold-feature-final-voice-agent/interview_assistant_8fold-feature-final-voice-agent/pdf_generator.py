@@ -1,7 +1,7 @@
-import os
 from fpdf import FPDF
 import textwrap
 import logging
+from report_store import get_report_store
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -69,13 +69,11 @@ class PDF(FPDF):
         self.ln(5)
 
 def create_feedback_pdf(session_id, transcript, feedback_data):
+    """
+    Renders the feedback report and saves it to the report store.
+    Returns the report's content key, or None on failure.
+    """
     try:
-        reports_dir = 'reports'
-        if not os.path.exists(reports_dir):
-            os.makedirs(reports_dir)
-        
-        filepath = os.path.join(reports_dir, f'feedback_report_{session_id}.pdf')
-
         pdf = PDF('P', 'mm', 'A4')
         pdf.set_margins(MARGIN, MARGIN, MARGIN)
         pdf.add_page()
@@ -158,9 +156,9 @@ def create_feedback_pdf(session_id, transcript, feedback_data):
             pdf.multi_cell(PRINTABLE_WIDTH, 6, sanitize_text(msg.content))
             pdf.ln(3)
 
-        pdf.output(filepath)
-        logger.info(f"PDF generated successfully: {filepath}")
-        return filepath
+        report_key = get_report_store().put(pdf.output())
+        logger.info(f"PDF generated successfully for session {session_id}: {report_key}")
+        return report_key
 
     except Exception as e:
         logger.error(f"FATAL PDF ERROR: {e}")
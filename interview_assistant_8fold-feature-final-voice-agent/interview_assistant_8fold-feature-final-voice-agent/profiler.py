@@ -0,0 +1,157 @@
+import os
+import sys
+import time
+import asyncio
+import threading
+import traceback
+import logging
+from collections import Counter
+from metrics import EVENT_LOOP_LAG
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# --- Configuration ---
+# Both features are off by default; nothing runs (no threads, no hooks) unless enabled.
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "false").lower() == "true"
+LOOP_LAG_THRESHOLD_MS = float(os.getenv("LOOP_LAG_THRESHOLD_MS", "0"))  # 0 disables the monitor
+
+MAX_PROFILE_SECONDS = 60
+MIN_INTERVAL_MS = 1
+
+
+class ProfilerBusy(RuntimeError):
+    """Raised when a profile is requested while another one is running."""
+
+
+# --- Sampling Profiler ---
+
+def _frame_label(frame):
+    code = frame.f_code
+    module = frame.f_globals.get("__name__", os.path.basename(code.co_filename))
+    return f"{module}:{code.co_name}"
+
+def _collapse(frame):
+    """Root-first 'mod:func;mod:func' string for a frame's stack."""
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    return ";".join(reversed(labels))
+
+
+class SamplingProfiler:
+    """
+    Wall-clock sampler over all threads of the live process.
+    Samples sys._current_frames() from a background thread for a bounded
+    duration and aggregates the stacks in collapsed format
+    (`thread;frame;frame count`), ready for flamegraph.pl or speedscope.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+
+    def profile(self, seconds: float, interval_ms: float = 5.0) -> str:
+        seconds = min(max(seconds, 0.1), MAX_PROFILE_SECONDS)
+        interval = max(interval_ms, MIN_INTERVAL_MS) / 1000
+
+        if not self._lock.acquire(blocking=False):
+            raise ProfilerBusy("A profile is already running in this worker.")
+        try:
+            stacks = Counter()
+            done = threading.Event()
+            sampler = threading.Thread(
+                target=self._sample, args=(stacks, seconds, interval, done),
+                name="sampling-profiler", daemon=True,
+            )
+            sampler.start()
+            done.wait(seconds + 5)
+            return "\n".join(f"{stack} {count}" for stack, count in stacks.most_common()) + "\n"
+        finally:
+            self._lock.release()
+
+    @staticmethod
+    def _sample(stacks, seconds, interval, done):
+        me = threading.get_ident()
+        names = {}
+        deadline = time.perf_counter() + seconds
+        try:
+            while time.perf_counter() < deadline:
+                if len(names) != threading.active_count():
+                    names = {t.ident: t.name for t in threading.enumerate()}
+                for ident, frame in sys._current_frames().items():
+                    if ident == me:
+                        continue
+                    stacks[f"{names.get(ident, ident)};{_collapse(frame)}"] += 1
+                time.sleep(interval)
+        finally:
+            done.set()
+
+
+profiler = SamplingProfiler()
+
+
+# --- Event-Loop Lag Monitor ---
+
+class LoopLagMonitor:
+    """
+    Detects callbacks that block the event loop.
+    A coroutine on the loop records a heartbeat every `interval`; a watchdog
+    thread checks it and, when the heartbeat is older than the threshold,
+    logs the loop thread's current stack (once per stall).
+    """
+
+    def __init__(self, threshold_ms: float, interval_ms: float = None):
+        self.threshold = threshold_ms / 1000
+        self.interval = (interval_ms / 1000) if interval_ms else max(self.threshold / 4, 0.005)
+        self._heartbeat = time.monotonic()
+        self._loop_thread_id = None
+        self._stop = threading.Event()
+        self._task = None
+        self._watchdog = None
+
+    def start(self):
+        """Call from within the running event loop (e.g. the FastAPI lifespan)."""
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._task = asyncio.get_running_loop().create_task(self._beat())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-lag-watchdog", daemon=True)
+        self._watchdog.start()
+        logger.info(f"Event-loop lag monitor started (threshold {self.threshold * 1000:.0f} ms)")
+
+    async def stop(self):
+        self._stop.set()
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        if self._watchdog:
+            self._watchdog.join(timeout=1)
+
+    async def _beat(self):
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            lag = max(0.0, now - expected)
+            EVENT_LOOP_LAG.observe(lag)
+            self._heartbeat = now
+            if lag >= self.threshold:
+                logger.warning(f"Event loop was blocked for {lag * 1000:.0f} ms in total")
+
+    def _watch(self):
+        reported = None  # Heartbeat value of the stall we already logged
+        while not self._stop.wait(self.interval):
+            heartbeat = self._heartbeat
+            lag = time.monotonic() - heartbeat
+            if lag < self.threshold or heartbeat == reported:
+                continue
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            reported = heartbeat
+            stack = "".join(traceback.format_stack(frame))
+            logger.warning(f"Event loop blocked for {lag * 1000:.0f} ms (still running). Loop thread stack:\n{stack}")
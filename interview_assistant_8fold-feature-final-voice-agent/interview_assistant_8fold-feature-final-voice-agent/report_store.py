@@ -0,0 +1,270 @@
+import os
+import gzip
+import time
+import hashlib
+import tempfile
+import threading
+import logging
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from dotenv import load_dotenv
+from metrics import (
+    REPORT_PUTS, REPORT_BYTES, REPORT_GET_MISSES, REPORT_EVICTIONS,
+    REPORT_EVICTED_BYTES, REPORT_DISK_BYTES, REPORT_FILES,
+)
+
+try:
+    import fcntl  # POSIX only; used to serialize retention sweeps across workers
+except ImportError:
+    fcntl = None
+
+load_dotenv()
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# --- Configuration ---
+REPORTS_DIR = os.getenv("REPORTS_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "reports"))
+REPORT_MAX_BYTES = int(os.getenv("REPORT_MAX_BYTES", str(512 * 1024 * 1024)))   # 512 MB on disk
+REPORT_MAX_AGE_DAYS = float(os.getenv("REPORT_MAX_AGE_DAYS", "30"))
+REPORT_SWEEP_INTERVAL = float(os.getenv("REPORT_SWEEP_INTERVAL", "300"))          # seconds between sweeps
+
+BLOB_SUFFIX = ".pdf.gz"
+EVICTION_GRACE_SECONDS = 60  # Never size-evict a report this fresh; it may still be being served
+
+
+class ReportStore(ABC):
+    """
+    Storage backend for generated feedback reports.
+    Reports are addressed by the SHA-256 of their (uncompressed) content.
+    """
+
+    @abstractmethod
+    def put(self, data: bytes) -> str: ...
+
+    @abstractmethod
+    def get(self, key: str) -> bytes: ...
+
+    @abstractmethod
+    def exists(self, key: str) -> bool: ...
+
+    @abstractmethod
+    def prune(self) -> int: ...
+
+
+class LocalReportStore(ReportStore):
+    """
+    Filesystem backend.
+    Layout: <root>/<key[0:2]>/<key[2:4]>/<key>.pdf.gz
+
+    Safe to share between worker processes:
+    - Writes go to a temp file in the target shard and are published with os.replace (atomic).
+    - Identical content maps to the same path, so concurrent writers of the same report are idempotent.
+    - Retention sweeps are serialized through an flock'd lock file and tolerate files vanishing mid-sweep.
+
+    Usage and retention counters are exported through metrics.py (report_store_* series).
+    """
+
+    def __init__(self, root=REPORTS_DIR, max_bytes=REPORT_MAX_BYTES,
+                 max_age_days=REPORT_MAX_AGE_DAYS, sweep_interval=REPORT_SWEEP_INTERVAL,
+                 compresslevel=6):
+        self.root = os.path.abspath(root)
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_days * 86400 if max_age_days else None
+        self.sweep_interval = sweep_interval
+        self.compresslevel = compresslevel
+        self._lock_path = os.path.join(self.root, ".retention.lock")
+        self._last_sweep = 0.0
+        self._sweeping = threading.Lock()  # Held by the background sweep thread
+        os.makedirs(self.root, exist_ok=True)
+
+    # --- Keys & Paths ---
+
+    @staticmethod
+    def key_for(data: bytes) -> str:
+        return hashlib.sha256(data).hexdigest()
+
+    def _path(self, key: str) -> str:
+        if len(key) != 64 or any(c not in "0123456789abcdef" for c in key):
+            raise ValueError(f"Invalid report key: {key!r}")
+        return os.path.join(self.root, key[0:2], key[2:4], key + BLOB_SUFFIX)
+
+    # --- Public API ---
+
+    def put(self, data: bytes) -> str:
+        data = bytes(data)
+        key = self.key_for(data)
+        path = self._path(key)
+
+        if os.path.exists(path):
+            # Same content already stored - just refresh its age for retention
+            try:
+                os.utime(path, None)
+            except FileNotFoundError:
+                pass  # Evicted between the check and the touch; fall through and rewrite
+            else:
+                REPORT_PUTS.labels(result="dedup").inc()
+                return key
+
+        shard = os.path.dirname(path)
+        os.makedirs(shard, exist_ok=True)
+
+        # mtime=0 keeps the compressed bytes deterministic for a given input
+        compressed = gzip.compress(data, compresslevel=self.compresslevel, mtime=0)
+        fd, tmp_path = tempfile.mkstemp(dir=shard, prefix=".tmp-", suffix=BLOB_SUFFIX)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(compressed)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+        except Exception:
+            try:
+                os.unlink(tmp_path)
+            except FileNotFoundError:
+                pass
+            raise
+
+        REPORT_PUTS.labels(result="written").inc()
+        REPORT_BYTES.labels(stage="uncompressed").inc(len(data))
+        REPORT_BYTES.labels(stage="compressed").inc(len(compressed))
+        self.maybe_prune()
+        return key
+
+    def get(self, key: str) -> bytes:
+        try:
+            with open(self._path(key), "rb") as f:
+                return gzip.decompress(f.read())
+        except FileNotFoundError:
+            REPORT_GET_MISSES.inc()
+            raise KeyError(key)
+
+    def exists(self, key: str) -> bool:
+        return os.path.exists(self._path(key))
+
+    # --- Retention ---
+
+    @contextmanager
+    def _sweep_lock(self):
+        """Yields True if this process holds the sweep lock, False if another worker does."""
+        if fcntl is None:
+            yield True
+            return
+        with open(self._lock_path, "a") as lock_file:
+            try:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                yield False
+                return
+            try:
+                yield True
+            finally:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    def _iter_blobs(self):
+        for dirpath, _, filenames in os.walk(self.root):
+            for name in filenames:
+                if not name.endswith(BLOB_SUFFIX):
+                    continue
+                path = os.path.join(dirpath, name)
+                try:
+                    st = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                yield path, name, st
+
+    def maybe_prune(self):
+        """
+        Starts a background sweep at most once per sweep_interval per process,
+        so the request that triggers it never waits on the directory walk.
+        """
+        now = time.time()
+        if now - self._last_sweep < self.sweep_interval or not self._sweeping.acquire(blocking=False):
+            return
+        self._last_sweep = now
+        threading.Thread(target=self._background_prune, name="report-retention", daemon=True).start()
+
+    def _background_prune(self):
+        try:
+            self.prune()
+        except Exception as e:
+            logger.error(f"Report retention sweep failed: {e}")
+        finally:
+            self._sweeping.release()
+
+    def prune(self) -> int:
+        """
+        Deletes reports older than max_age, then the oldest reports until
+        total size is under max_bytes (skipping reports younger than the
+        eviction grace period). Returns the number of files removed.
+        """
+        with self._sweep_lock() as acquired:
+            if not acquired:
+                return 0
+
+            now = time.time()
+            removed = 0
+            removed_bytes = 0
+            survivors = []
+
+            def evict(path, size, reason):
+                nonlocal removed, removed_bytes
+                if self._unlink(path):
+                    removed += 1
+                    removed_bytes += size
+                    REPORT_EVICTIONS.labels(reason=reason).inc()
+                    REPORT_EVICTED_BYTES.inc(size)
+
+            for path, name, st in self._iter_blobs():
+                if name.startswith(".tmp-"):
+                    # Leftover temp files from a crashed writer
+                    if now - st.st_mtime > 3600:
+                        evict(path, st.st_size, "stale_tmp")
+                elif self.max_age_seconds is not None and now - st.st_mtime > self.max_age_seconds:
+                    evict(path, st.st_size, "age")
+                else:
+                    survivors.append((st.st_mtime, st.st_size, path))
+
+            total = sum(size for _, size, _ in survivors)
+            kept = len(survivors)
+            if self.max_bytes:
+                survivors.sort()  # Oldest first
+                for mtime, size, path in survivors:
+                    if total <= self.max_bytes:
+                        break
+                    if now - mtime < EVICTION_GRACE_SECONDS:
+                        break  # Everything after this is newer still
+                    evict(path, size, "size")
+                    total -= size
+                    kept -= 1
+
+            REPORT_DISK_BYTES.set(total)
+            REPORT_FILES.set(kept)
+            if removed:
+                logger.info(f"Report retention removed {removed} files ({removed_bytes} bytes)")
+            return removed
+
+    @staticmethod
+    def _unlink(path) -> bool:
+        try:
+            os.unlink(path)
+            return True
+        except FileNotFoundError:
+            return False  # Another worker got there first
+
+
+# --- Global Store Instance ---
+_store = None
+_store_lock = threading.Lock()
+
+def get_report_store() -> ReportStore:
+    """
+    Returns the process-wide report store (local filesystem backend).
+    """
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = LocalReportStore()
+    return _store
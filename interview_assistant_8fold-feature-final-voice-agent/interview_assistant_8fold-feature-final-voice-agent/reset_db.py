@@ -1,4 +1,4 @@
-from database import engine, Base
+from database import engine, Base, init_db
 from models import User, Interview
 
 print("Dropping all tables...")
@@ -6,5 +6,5 @@ Base.metadata.drop_all(bind=engine)
 print("Tables dropped.")
 
 print("Recreating tables...")
-Base.metadata.create_all(bind=engine)
+init_db()
 print("Tables recreated successfully.")
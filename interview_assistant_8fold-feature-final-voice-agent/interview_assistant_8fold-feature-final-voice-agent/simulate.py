@@ -0,0 +1,320 @@
+"""
+Batch offline interview simulation and evaluation.
+
+Replays scripted sessions through InterviewAgent (start -> critic/interviewer
+turns -> feedback) across a process pool and writes one NDJSON record per
+session with critic decisions, interviewer replies, feedback JSON and
+per-stage timings. A turn whose interviewer call failed (and was rolled back
+by the agent) is recorded with status "error" and left out of drift rates
+and turn latencies.
+
+Session scripts: a directory of *.json files (or subdirectories holding a
+session.json), each like
+    {"job_description": "...", "resume": "resume.pdf", "answers": ["...", "..."]}
+`resume` is a .pdf or .txt path relative to the script.
+
+Usage:
+    python simulate.py run sessions/ -o results.ndjson --model fake --workers 8
+    python simulate.py run sessions/ -o results.ndjson --model recorded --recording llm_recording.ndjson
+    python simulate.py compare baseline.ndjson results.ndjson
+"""
+import os
+import io
+import sys
+import json
+import time
+import uuid
+import asyncio
+import argparse
+import tempfile
+import logging
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+# Set up logging
+logging.basicConfig(level=logging.WARNING)
+logger = logging.getLogger("simulate")
+
+_agent = None
+_stage_times = {}
+_critic_results = []  # Decisions returned by the critic during the current turn
+_rubrics = {}  # Per-worker stand-in for jd_library's cache: jd_id -> rubric
+
+
+# --- Session Loading ---
+
+def load_sessions(path):
+    """Returns a list of (name, script_dict, base_dir) sorted by name."""
+    sessions = []
+    for entry in sorted(os.listdir(path)):
+        full = os.path.join(path, entry)
+        if os.path.isdir(full) and os.path.exists(os.path.join(full, "session.json")):
+            script_path, name = os.path.join(full, "session.json"), entry
+        elif entry.endswith(".json"):
+            script_path, name = full, entry[:-len(".json")]
+        else:
+            continue
+        with open(script_path, encoding="utf-8") as f:
+            sessions.append((name, json.load(f), os.path.dirname(script_path)))
+    return sessions
+
+
+def read_resume(script, base_dir):
+    resume = script.get("resume", "")
+    resume_path = os.path.join(base_dir, resume) if resume else ""
+    if not resume_path or not os.path.isfile(resume_path):
+        return resume  # Inline resume text
+    if resume_path.lower().endswith(".pdf"):
+        from pypdf import PdfReader
+        with open(resume_path, "rb") as f:
+            reader = PdfReader(io.BytesIO(f.read()))
+        return "".join(page.extract_text() or "" for page in reader.pages)
+    with open(resume_path, encoding="utf-8") as f:
+        return f.read()
+
+
+# --- Worker ---
+
+def _timed(stage, fn):
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _stage_times.setdefault(stage, []).append(time.perf_counter() - start)
+    return wrapper
+
+
+def _recorded(fn):
+    def wrapper(*args, **kwargs):
+        result = fn(*args, **kwargs)
+        _critic_results.append(result)
+        return result
+    return wrapper
+
+
+def init_worker(env):
+    """Builds one agent per process; env must be applied before llm_utils is imported."""
+    global _agent
+    os.environ.update(env)
+    logging.getLogger().setLevel(logging.WARNING)
+
+    import pdf_generator
+    from interview_agent import InterviewAgent
+
+    _agent = InterviewAgent()
+    # Instance/module-level wrappers so stream_interact and end_interview report stage timings
+    _agent._critic_node = _timed("critic", _recorded(_agent._critic_node))
+    pdf_generator.create_feedback_pdf = _timed("pdf", pdf_generator.create_feedback_pdf)
+
+
+async def _run_turns(session_id, answers):
+    config = {"configurable": {"thread_id": session_id}}
+    turns = []
+    for answer in answers:
+        _stage_times.clear()
+        _critic_results.clear()
+        committed_before = _agent.graph.get_state(config).values.get("question_count", 0)
+        start = time.perf_counter()
+        first_token = None
+        chunks = []
+        async for chunk in _agent.stream_interact(answer, session_id):
+            if first_token is None:
+                first_token = time.perf_counter() - start
+            chunks.append(chunk)
+        total = time.perf_counter() - start
+
+        # The agent only advances question_count when the turn is committed; a failed
+        # interviewer stream yields an apology and rolls the state back instead
+        committed = _agent.graph.get_state(config).values.get("question_count", 0) > committed_before
+        critic = _critic_results[-1] if _critic_results else {}
+        critic_s = sum(_stage_times.get("critic", []))
+        turns.append({
+            "answer": answer,
+            "status": "ok" if committed else "error",
+            "critic": {"difficulty": critic.get("difficulty"), "critique": critic.get("critique")},
+            "reply": "".join(chunks),
+            "timings": {
+                "critic_s": critic_s,
+                "ttft_s": first_token,
+                "interviewer_s": total - critic_s,
+                "total_s": total,
+            },
+        })
+    return turns
+
+
+def run_session(name, script, base_dir):
+    session_id = f"sim-{name}-{uuid.uuid4().hex[:8]}"
+    record = {"session": name, "session_id": session_id, "status": "ok"}
+    timings = {}
+    started = time.perf_counter()
+    try:
+        resume_text = read_resume(script, base_dir)
+        job_description = script.get("job_description", "")
+
+        # Like /start_interview: one rubric per distinct JD, reused across sessions
+        from jd_library import job_description_id
+        jd_id = job_description_id(job_description)
+        if jd_id not in _rubrics:
+            t0 = time.perf_counter()
+            _rubrics[jd_id] = _agent.generate_role_rubric(job_description)
+            timings["rubric_s"] = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        record["greeting"] = _agent.start_interview(job_description, resume_text, session_id, rubric=_rubrics[jd_id])
+        timings["start_s"] = time.perf_counter() - t0
+
+        record["turns"] = asyncio.run(_run_turns(session_id, script.get("answers", [])))
+        record["turn_errors"] = sum(1 for t in record["turns"] if t["status"] != "ok")
+
+        _stage_times.clear()
+        t0 = time.perf_counter()
+        report_key, feedback = _agent.end_interview(session_id)
+        timings["end_s"] = time.perf_counter() - t0
+        timings["pdf_s"] = sum(_stage_times.get("pdf", []))
+        timings["feedback_llm_s"] = timings["end_s"] - timings["pdf_s"]
+        record["feedback"] = feedback
+        record["report_key"] = report_key
+    except Exception as e:
+        record["status"] = "error"
+        record["error"] = f"{type(e).__name__}: {e}"
+    timings["total_s"] = time.perf_counter() - started
+    record["timings"] = timings
+    return record
+
+
+# --- Reporting ---
+
+def percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(0, -(-len(ordered) * pct // 100) - 1)]
+
+
+def latency_summary(records):
+    stages = {}
+    for r in records:
+        for key, value in r.get("timings", {}).items():
+            stages.setdefault(key, []).append(value)
+        for turn in r.get("turns", []):
+            if turn.get("status", "ok") != "ok":
+                continue
+            for key, value in turn["timings"].items():
+                if value is not None:
+                    stages.setdefault(f"turn_{key}", []).append(value)
+    return {k: {"p50": percentile(v, 50), "p95": percentile(v, 95)} for k, v in sorted(stages.items())}
+
+
+def print_summary(records, wall):
+    errors = sum(1 for r in records if r["status"] != "ok")
+    turn_errors = sum(r.get("turn_errors", 0) for r in records)
+    print(f"{len(records)} sessions in {wall:.1f} s ({errors} errors, {turn_errors} failed turns)", file=sys.stderr)
+    for stage, s in latency_summary(records).items():
+        print(f"  {stage:<22} p50 {s['p50'] * 1000:9.1f} ms   p95 {s['p95'] * 1000:9.1f} ms", file=sys.stderr)
+
+
+def read_ndjson(path):
+    with open(path, encoding="utf-8") as f:
+        return {r["session"]: r for r in (json.loads(line) for line in f if line.strip())}
+
+
+def _verdict(record):
+    summary = (record.get("feedback") or {}).get("overall_summary", {})
+    return summary.get("final_verdict") if isinstance(summary, dict) else None
+
+
+def compare(baseline_path, candidate_path):
+    """Output drift and latency deltas between two runs over the same sessions."""
+    base, cand = read_ndjson(baseline_path), read_ndjson(candidate_path)
+    common = sorted(set(base) & set(cand))
+    turns = critic_same = reply_same = verdict_same = skipped = 0
+    for name in common:
+        b, c = base[name], cand[name]
+        verdict_same += _verdict(b) == _verdict(c)
+        for bt, ct in zip(b.get("turns", []), c.get("turns", [])):
+            if bt.get("status", "ok") != "ok" or ct.get("status", "ok") != "ok":
+                skipped += 1  # A failed turn says nothing about model drift
+                continue
+            turns += 1
+            critic_same += bt["critic"]["difficulty"] == ct["critic"]["difficulty"]
+            reply_same += bt["reply"] == ct["reply"]
+
+    def rate(n, d):
+        return f"{n / d:.1%}" if d else "n/a"
+
+    print(f"sessions compared: {len(common)} (only in baseline: {len(set(base) - set(cand))}, only in candidate: {len(set(cand) - set(base))})")
+    print(f"critic difficulty unchanged: {rate(critic_same, turns)} of {turns} turns")
+    print(f"interviewer reply unchanged: {rate(reply_same, turns)} of {turns} turns")
+    print(f"final verdict unchanged:     {rate(verdict_same, len(common))} of {len(common)} sessions")
+    print(f"turns skipped (failed in either run): {skipped}")
+
+    b_lat = latency_summary([base[n] for n in common])
+    c_lat = latency_summary([cand[n] for n in common])
+    print(f"\n{'stage':<22}{'base p50':>12}{'cand p50':>12}{'delta':>10}")
+    for stage in b_lat:
+        if stage not in c_lat or not b_lat[stage]["p50"]:
+            continue
+        bp, cp = b_lat[stage]["p50"], c_lat[stage]["p50"]
+        print(f"{stage:<22}{bp * 1000:10.1f}ms{cp * 1000:10.1f}ms{(cp - bp) / bp:+10.1%}")
+
+
+# --- CLI ---
+
+def run(args):
+    sessions = load_sessions(args.sessions)
+    if not sessions:
+        sys.exit(f"No session scripts found in {args.sessions}")
+
+    env = {
+        "LLM_PROVIDER": args.model,
+        "LLM_RECORDING": os.path.abspath(args.recording),
+        "LLM_RECORD_MISSES": "true" if args.record_misses else "false",
+        "FAKE_LLM_SEED": str(args.seed),
+        "REPORTS_DIR": os.path.abspath(args.reports_dir or tempfile.mkdtemp(prefix="sim-reports-")),
+        # The simulation never touches the app database; keep jd_library/models imports off it
+        "DATABASE_URL": "sqlite://",
+    }
+
+    started = time.perf_counter()
+    records = []
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=init_worker, initargs=(env,)) as pool, \
+            open(args.output, "w", encoding="utf-8") as out:
+        futures = [pool.submit(run_session, name, script, base) for name, script, base in sessions]
+        for future in as_completed(futures):
+            record = future.result()
+            if args.label:
+                record["label"] = args.label
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            records.append(record)
+    print_summary(records, time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch offline interview simulation.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_run = sub.add_parser("run", help="Simulate scripted sessions and write NDJSON results")
+    p_run.add_argument("sessions", help="Directory of session scripts")
+    p_run.add_argument("-o", "--output", default="simulation_results.ndjson")
+    p_run.add_argument("--model", choices=["fake", "recorded", "gemini"], default="fake")
+    p_run.add_argument("--recording", default="llm_recording.ndjson", help="Recording file for --model recorded")
+    p_run.add_argument("--record-misses", action="store_true", help="Call Gemini on recording misses and append them")
+    p_run.add_argument("--workers", type=int, default=os.cpu_count())
+    p_run.add_argument("--seed", type=int, default=0)
+    p_run.add_argument("--label", help="Version label stored on every record (e.g. a git SHA)")
+    p_run.add_argument("--reports-dir", help="Where PDFs go (default: a temporary directory)")
+
+    p_cmp = sub.add_parser("compare", help="Compare two result files for output drift and latency")
+    p_cmp.add_argument("baseline")
+    p_cmp.add_argument("candidate")
+
+    args = parser.parse_args()
+    if args.command == "run":
+        run(args)
+    else:
+        compare(args.baseline, args.candidate)
+
+
+if __name__ == "__main__":
+    main()
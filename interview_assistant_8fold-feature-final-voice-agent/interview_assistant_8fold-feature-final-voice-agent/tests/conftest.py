@@ -0,0 +1,24 @@
+import os
+import sys
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+# The app modules live flat in the project directory (run from there, like main.py)
+sys.path.insert(0, os.path.dirname(os.path.abspath(os.path.dirname(__file__))))
+
+# Keep database.py off the configured server; tests that need tables use `session_factory`
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("LLM_PROVIDER", "fake")
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    """Sessionmaker bound to a fresh SQLite file with the app's tables."""
+    from database import Base
+    import models  # noqa: F401 - registers the tables on Base.metadata
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    yield sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    engine.dispose()
@@ -0,0 +1,93 @@
+import csv
+import io
+import json
+import zlib
+from datetime import datetime
+import pytest
+import export
+from export import normalize_score, accepts_gzip, iter_export, SESSION_FIELDS, TURN_FIELDS
+from models import User, Interview
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("7/10", 7), ("7", 7), (7, 7), (" 8 / 10 ", 8), ("6.5", 6),
+    (None, None), ("", None), ("N/A", None), ("1-10", None),
+    ("inf", None), ("1e999", None), ("nan", None), (float("inf"), None),
+])
+def test_normalize_score(value, expected):
+    assert normalize_score(value) == expected
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("gzip", True), ("GZIP, deflate", True), ("deflate, gzip;q=0.5", True), ("*", True),
+    ("gzip;q=0", False), ("gzip; q=0.0, deflate", False), ("*;q=0", False), ("gzip;q=0, *", False),
+    ("identity", False), ("", False), (None, False), ("gzip;q=bogus", False),
+])
+def test_accepts_gzip(header, expected):
+    assert accepts_gzip(header) is expected
+
+
+@pytest.fixture
+def seeded(session_factory, monkeypatch):
+    """Two users; alice has a completed interview with LLM-written feedback, bob an empty one."""
+    monkeypatch.setattr(export, "SessionLocal", session_factory)
+    with session_factory() as db:
+        alice, bob = User(email="alice@example.com"), User(email="bob@example.com")
+        db.add_all([alice, bob])
+        db.flush()
+        db.add_all([
+            Interview(id="i-1", user_id=alice.id, status="COMPLETED", created_at=datetime(2026, 1, 5), feedback_json={
+                "overall_summary": {"final_verdict": "HIRE", "soft_skill_score": "8/10", "hard_skill_score": "1e999"},
+                "question_analysis": [
+                    {"question": "Design, a cache", "answer": 'Said "LRU"\nthen TTL', "feedback": "Good", "score": "7/10"},
+                    "not a dict",
+                    {"question": "Scale it", "answer": "Shard", "feedback": "Vague", "score": "inf"},
+                ],
+            }),
+            Interview(id="i-2", user_id=bob.id, status="IN_PROGRESS", created_at=datetime(2026, 2, 1), feedback_json={}),
+        ])
+        db.commit()
+        return {"alice": alice.id, "bob": bob.id}
+
+
+def collect(**kwargs):
+    return b"".join(iter_export(**kwargs))
+
+
+def test_ndjson_sessions_one_object_per_line(seeded):
+    lines = collect(fmt="ndjson", rows="sessions").decode().splitlines()
+    records = [json.loads(line) for line in lines]
+    assert [r["interview_id"] for r in records] == ["i-1", "i-2"]
+    assert set(records[0]) == set(SESSION_FIELDS)
+    assert records[0]["soft_skill_score"] == 8
+    assert records[0]["hard_skill_score"] is None  # Overflowing score doesn't abort the stream
+    assert records[0]["question_count"] == 3
+    assert records[1]["final_verdict"] is None
+
+
+def test_csv_turns_quotes_embedded_commas_quotes_and_newlines(seeded):
+    rows = list(csv.DictReader(io.StringIO(collect(fmt="csv", rows="turns").decode())))
+    assert [(r["interview_id"], r["turn"], r["score"]) for r in rows] == [("i-1", "1", "7"), ("i-1", "3", "")]
+    assert rows[0]["question"] == "Design, a cache"
+    assert rows[0]["answer"] == 'Said "LRU"\nthen TTL'
+
+
+def test_csv_header_only_when_nothing_matches(seeded):
+    body = collect(fmt="csv", rows="turns", since=datetime(2030, 1, 1)).decode()
+    assert body.strip() == ",".join(TURN_FIELDS)
+
+
+def test_filters_by_user_and_date_range(seeded):
+    def ids(**filters):
+        return [json.loads(line)["interview_id"] for line in collect(**filters).decode().splitlines()]
+
+    assert ids(user_id=seeded["bob"]) == ["i-2"]
+    assert ids(since=datetime(2026, 1, 10)) == ["i-2"]
+    assert ids(until=datetime(2026, 1, 10)) == ["i-1"]
+
+
+def test_gzip_output_matches_plain_output_across_chunks(seeded, monkeypatch):
+    monkeypatch.setattr(export, "FLUSH_BYTES", 16)  # Force several compressed chunks
+    chunks = list(iter_export(fmt="csv", rows="turns", gzip=True))
+    assert len(chunks) > 1
+    assert zlib.decompress(b"".join(chunks), 31) == collect(fmt="csv", rows="turns")
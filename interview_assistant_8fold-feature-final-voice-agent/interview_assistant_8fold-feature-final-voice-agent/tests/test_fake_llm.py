@@ -0,0 +1,52 @@
+import json
+import pytest
+import llm_utils
+from fake_llm import FakeLLMError
+
+
+@pytest.fixture
+def failure_rate(monkeypatch):
+    def configure(rate):
+        monkeypatch.setenv("FAKE_LLM_FAILURE_RATE", str(rate))
+        llm_utils._fake.cache_clear()
+    yield configure
+    llm_utils._fake.cache_clear()
+
+
+def test_feedback_failure_rate_mixes_successes_and_failures(failure_rate):
+    failure_rate(0.5)
+    outcomes = []
+    for _ in range(200):
+        try:
+            llm_utils.get_feedback_llm().invoke("OUTPUT JSON")
+            outcomes.append(True)
+        except FakeLLMError:
+            outcomes.append(False)
+    assert 60 < outcomes.count(False) < 140
+
+
+def test_fake_models_are_shared_per_mode(failure_rate):
+    failure_rate(0)
+    assert llm_utils.get_feedback_llm() is llm_utils.get_feedback_llm()
+    assert llm_utils.get_llm() is not llm_utils.get_feedback_llm()
+    assert llm_utils.get_feedback_llm().json_mode
+
+
+def test_recording_is_loaded_once_per_path(tmp_path, monkeypatch):
+    from langchain_core.messages import HumanMessage
+    import fake_llm
+    from fake_llm import FakeChatModel, RecordedChatModel, prompt_key
+
+    path = tmp_path / "recording.ndjson"
+    recorded, missed = [HumanMessage(content="recorded")], [HumanMessage(content="missed")]
+    path.write_text(json.dumps({"key": prompt_key(recorded), "response": "from disk"}) + "\n")
+    monkeypatch.setattr(fake_llm, "_recordings", {})
+
+    first = RecordedChatModel(recording_path=str(path), delegate=FakeChatModel())
+    assert first.invoke(recorded).content == "from disk"
+    first.invoke(missed)  # Appended to the file and the shared responses
+
+    path.write_text("")  # A re-read would now lose both entries
+    second = RecordedChatModel(recording_path=str(path))
+    assert second.invoke(recorded).content == "from disk"
+    assert second.invoke(missed).content == first.invoke(missed).content
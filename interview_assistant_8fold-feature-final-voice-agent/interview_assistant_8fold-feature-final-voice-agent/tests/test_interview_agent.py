@@ -0,0 +1,85 @@
+import asyncio
+import pytest
+import report_store
+import interview_agent
+from langchain_core.messages import AIMessage
+from fake_llm import FakeChatModel
+from metrics import LIVE_SESSIONS, LLM_INFLIGHT
+from interview_agent import InterviewAgent
+
+
+@pytest.fixture
+def agent(tmp_path, monkeypatch):
+    monkeypatch.setattr(report_store, "_store", report_store.LocalReportStore(root=tmp_path / "reports"))
+    return InterviewAgent()
+
+
+def test_repeated_end_interview_decrements_live_sessions_once(agent):
+    before = LIVE_SESSIONS._value.get()
+    agent.start_interview("Backend Engineer", "Python developer", "live-gauge")
+    assert LIVE_SESSIONS._value.get() == before + 1
+
+    report_key, _ = agent.end_interview("live-gauge")
+    assert report_key
+    agent.end_interview("live-gauge")  # Retry / double click
+    assert LIVE_SESSIONS._value.get() == before
+
+
+# --- Abandoned Turns ---
+
+def _state(agent, session_id):
+    return agent.graph.get_state({"configurable": {"thread_id": session_id}}).values
+
+
+def _start(agent, session_id):
+    agent.start_interview("Backend Engineer", "Python developer", session_id)
+    state = _state(agent, session_id)
+    return [m.content for m in state["messages"]], state["question_count"]
+
+
+async def _first_chunk_then_disconnect(agent, session_id):
+    stream = agent.stream_interact("I built a FastAPI service.", session_id)
+    first = await stream.__anext__()
+    await stream.aclose()  # What StreamingResponse does when the client goes away
+    return first
+
+
+def test_disconnect_after_first_chunk_rolls_back_turn(agent):
+    messages, question_count = _start(agent, "disconnect-rollback")
+    asyncio.run(_first_chunk_then_disconnect(agent, "disconnect-rollback"))
+
+    state = _state(agent, "disconnect-rollback")
+    assert [m.content for m in state["messages"]] == messages
+    assert state["question_count"] == question_count
+    assert LLM_INFLIGHT._value.get() == 0
+
+
+def test_disconnect_with_mark_incomplete_keeps_partial_reply(agent, monkeypatch):
+    monkeypatch.setattr(interview_agent, "DISCONNECT_POLICY", "mark_incomplete")
+    messages, question_count = _start(agent, "disconnect-partial")
+    first = asyncio.run(_first_chunk_then_disconnect(agent, "disconnect-partial"))
+
+    state = _state(agent, "disconnect-partial")
+    partial = state["messages"][-1]
+    assert isinstance(partial, AIMessage)
+    assert partial.content == first
+    assert partial.response_metadata["incomplete"] is True
+    assert state["messages"][-2].content == "I built a FastAPI service."
+    assert len(state["messages"]) == len(messages) + 2
+    assert state["question_count"] == question_count + 1
+
+
+def test_failed_stream_rolls_back_without_saving_apology(agent):
+    messages, question_count = _start(agent, "stream-error")
+    agent.llm = FakeChatModel(failure_rate=1.0)
+
+    async def consume():
+        return [chunk async for chunk in agent.stream_interact("We sharded Postgres.", "stream-error")]
+
+    chunks = asyncio.run(consume())
+    assert "trouble connecting" in "".join(chunks)  # The client still gets an apology
+
+    state = _state(agent, "stream-error")
+    assert [m.content for m in state["messages"]] == messages
+    assert state["question_count"] == question_count
+    assert LLM_INFLIGHT._value.get() == 0
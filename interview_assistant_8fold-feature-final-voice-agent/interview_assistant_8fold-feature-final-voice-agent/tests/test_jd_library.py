@@ -0,0 +1,117 @@
+import json
+import time
+import threading
+import pytest
+import jd_library
+from jd_library import normalize_job_description, job_description_id, resolve_job_description
+from models import JobDescription
+
+JD = "Senior Backend Engineer:\n  Python,   FastAPI"
+RUBRIC = {"role_title": "Backend Engineer", "key_competencies": ["APIs"], "question_seeds": ["Design an API"]}
+
+
+@pytest.fixture(autouse=True)
+def clean_caches():
+    for state in (jd_library._rubric_cache, jd_library._failed_until, jd_library._generation_locks):
+        state.clear()
+    yield
+
+
+class Generator:
+    def __init__(self, result=RUBRIC, delay=0.0):
+        self.result = result
+        self.delay = delay
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, text):
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.delay)
+        if isinstance(self.result, Exception):
+            raise self.result
+        return self.result
+
+
+# --- Normalization ---
+
+def test_normalize_collapses_whitespace_case_and_unicode_forms():
+    assert normalize_job_description("  Senior\tBackend\n\nENGINEER ") == "senior backend engineer"
+    assert normalize_job_description("ｐｙｔｈｏｎ\u00a0dev") == "python dev"  # NFKC: fullwidth letters, NBSP
+    assert normalize_job_description(None) == ""
+
+
+def test_job_description_id_is_stable_across_formatting():
+    assert job_description_id(JD) == job_description_id("senior backend engineer: python, fastapi")
+    # Pinned: changing normalization or hashing would orphan every stored JD row
+    assert job_description_id(JD) == "4aa17f70dc181610a19a6c18b9999bff9e656fa232c5265e1d38564f04ca6434"
+    assert job_description_id(JD) != job_description_id("Junior Backend Engineer: Python, FastAPI")
+
+
+# --- Rubric Resolution ---
+
+def test_rubric_is_generated_once_and_stored(session_factory):
+    generate = Generator()
+    with session_factory() as db:
+        jd_id, rubric = resolve_job_description(db, JD, generate)
+        assert (jd_id, rubric) == (job_description_id(JD), RUBRIC)
+        assert resolve_job_description(db, JD.upper(), generate) == (jd_id, RUBRIC)
+    assert generate.calls == 1
+    with session_factory() as db:
+        assert db.get(JobDescription, jd_id).rubric_json == RUBRIC
+
+
+def test_stored_rubric_is_reused_after_cache_loss(session_factory):
+    with session_factory() as db:
+        resolve_job_description(db, JD, Generator())
+    jd_library._rubric_cache.clear()  # e.g. another worker process
+
+    generate = Generator()
+    with session_factory() as db:
+        assert resolve_job_description(db, JD, generate)[1] == RUBRIC
+    assert generate.calls == 0
+
+
+def test_concurrent_sessions_on_a_new_jd_generate_once(session_factory):
+    generate = Generator(delay=0.05)
+    results = []
+
+    def start_session():
+        with session_factory() as db:
+            results.append(resolve_job_description(db, JD, generate)[1])
+
+    threads = [threading.Thread(target=start_session) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert generate.calls == 1
+    assert results == [RUBRIC] * 8
+    assert jd_library._generation_locks == {}
+
+
+def test_failed_generation_is_not_retried_until_backoff_expires(session_factory, monkeypatch):
+    failing = Generator(result=RuntimeError("LLM down"))
+    with session_factory() as db:
+        assert resolve_job_description(db, JD, failing) == (job_description_id(JD), None)
+        assert resolve_job_description(db, JD, failing)[1] is None
+    assert failing.calls == 1
+
+    monkeypatch.setattr(jd_library, "RUBRIC_RETRY_SECONDS", 0)
+    jd_library._failed_until.clear()
+    with session_factory() as db:
+        resolve_job_description(db, JD, failing)  # Marks failed with a zero-length backoff
+        assert resolve_job_description(db, JD, Generator())[1] == RUBRIC
+
+
+# --- Fake Model ---
+
+def test_fake_interviewer_reply_with_rubric_is_not_json():
+    from interview_agent import InterviewAgent
+
+    agent = InterviewAgent()
+    greeting = agent.start_interview(JD, "Python developer", "jd-test-session", rubric=RUBRIC)
+    with pytest.raises(json.JSONDecodeError):
+        json.loads(greeting)
+    assert agent.generate_role_rubric(JD)["question_seeds"]
@@ -0,0 +1,57 @@
+import pytest
+from fastapi.testclient import TestClient
+import main
+
+
+@pytest.fixture
+def client():
+    return TestClient(main.app)  # No lifespan: these endpoints need no schema
+
+
+@pytest.mark.parametrize("headers", [{}, {"Authorization": "Bearer not-a-token"}])
+def test_profile_is_404_before_auth_when_profiling_disabled(client, monkeypatch, headers):
+    monkeypatch.setattr(main, "PROFILING_ENABLED", False)
+    assert client.get("/admin/profile", headers=headers).status_code == 404
+
+
+def test_profile_requires_auth_when_profiling_enabled(client, monkeypatch):
+    monkeypatch.setattr(main, "PROFILING_ENABLED", True)
+    assert client.get("/admin/profile").status_code == 401
+
+
+# --- Export ---
+
+@pytest.fixture
+def export_client(session_factory, monkeypatch):
+    import export
+    from auth import create_access_token
+    from database import get_db
+    from models import User
+
+    def override_get_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    monkeypatch.setattr(export, "SessionLocal", session_factory)
+    main.app.dependency_overrides[get_db] = override_get_db
+    with session_factory() as db:
+        db.add_all([User(email="Alice@Example.com"), User(email="bob@example.com")])
+        db.commit()
+    token = create_access_token({"sub": "Alice@Example.com"})
+    yield TestClient(main.app, headers={"Authorization": f"Bearer {token}"})
+    main.app.dependency_overrides.pop(get_db, None)
+
+
+def test_export_honours_gzip_q_zero(export_client):
+    resp = export_client.get("/export", headers={"Accept-Encoding": "gzip;q=0, identity"})
+    assert resp.status_code == 200
+    assert "content-encoding" not in resp.headers
+    assert export_client.get("/export", headers={"Accept-Encoding": "gzip"}).headers["content-encoding"] == "gzip"
+
+
+def test_export_own_email_is_case_insensitive(export_client):
+    assert export_client.get("/export", params={"user": "alice@example.COM"}).status_code == 200
+    assert export_client.get("/export", params={"user": "bob@example.com"}).status_code == 403
@@ -0,0 +1,118 @@
+import os
+import time
+import pytest
+import report_store
+from report_store import LocalReportStore, ReportStore, EVICTION_GRACE_SECONDS
+
+
+def make_store(tmp_path, **kwargs):
+    kwargs.setdefault("max_bytes", 0)
+    kwargs.setdefault("max_age_days", 0)
+    kwargs.setdefault("sweep_interval", 3600)
+    return LocalReportStore(root=tmp_path, **kwargs)
+
+
+def age(store, key, seconds):
+    path = store._path(key)
+    then = time.time() - seconds
+    os.utime(path, (then, then))
+    return path
+
+
+def test_base_is_abstract():
+    with pytest.raises(TypeError):
+        ReportStore()
+
+
+def test_put_get_roundtrip_and_layout(tmp_path):
+    store = make_store(tmp_path)
+    key = store.put(b"%PDF-1.4 report")
+    assert key == LocalReportStore.key_for(b"%PDF-1.4 report")
+    assert store._path(key) == os.path.join(str(tmp_path), key[:2], key[2:4], key + ".pdf.gz")
+    assert store.get(key) == b"%PDF-1.4 report"
+    assert store.exists(key)
+
+
+def test_put_same_content_is_deduplicated(tmp_path):
+    store = make_store(tmp_path)
+    key = store.put(b"same")
+    path = age(store, key, 1000)
+    before = os.stat(path).st_mtime
+    assert store.put(b"same") == key
+    assert os.stat(path).st_mtime > before  # Refreshed for retention
+
+
+def test_get_missing_and_invalid_keys(tmp_path):
+    store = make_store(tmp_path)
+    with pytest.raises(KeyError):
+        store.get("0" * 64)
+    with pytest.raises(ValueError):
+        store.get("../../etc/passwd")
+
+
+def test_prune_removes_expired_reports(tmp_path):
+    store = make_store(tmp_path, max_age_days=1)
+    old = store.put(b"old")
+    new = store.put(b"new")
+    age(store, old, 2 * 86400)
+    assert store.prune() == 1
+    assert not store.exists(old)
+    assert store.exists(new)
+
+
+def test_prune_evicts_oldest_first_until_under_size_limit(tmp_path):
+    data = [os.urandom(2000) for _ in range(3)]  # Incompressible, so each blob is ~2 KB
+    store = make_store(tmp_path)
+    keys = [store.put(d) for d in data]
+    for i, key in enumerate(keys):
+        age(store, key, EVICTION_GRACE_SECONDS + 1000 - i * 100)  # keys[0] is the oldest
+    store.max_bytes = 2 * os.stat(store._path(keys[0])).st_size + 100
+
+    assert store.prune() == 1
+    assert not store.exists(keys[0])
+    assert store.exists(keys[1]) and store.exists(keys[2])
+
+
+def test_prune_never_size_evicts_reports_inside_grace_period(tmp_path):
+    store = make_store(tmp_path, max_bytes=1)
+    old = store.put(os.urandom(500))
+    fresh = store.put(os.urandom(500))
+    age(store, old, EVICTION_GRACE_SECONDS + 10)
+
+    assert store.prune() == 1
+    assert not store.exists(old)
+    assert store.exists(fresh)  # Still over the limit, but too new to evict
+
+
+def test_prune_removes_only_stale_temp_files(tmp_path):
+    store = make_store(tmp_path)
+    shard = tmp_path / "ab" / "cd"
+    shard.mkdir(parents=True)
+    stale, live = shard / ".tmp-stale.pdf.gz", shard / ".tmp-live.pdf.gz"
+    stale.write_bytes(b"x")
+    live.write_bytes(b"x")
+    then = time.time() - 7200
+    os.utime(stale, (then, then))
+
+    assert store.prune() == 1
+    assert not stale.exists() and live.exists()
+
+
+def test_prune_updates_disk_gauges(tmp_path):
+    store = make_store(tmp_path)
+    key = store.put(b"gauge")
+    store.prune()
+    assert report_store.REPORT_FILES._value.get() == 1
+    assert report_store.REPORT_DISK_BYTES._value.get() == os.stat(store._path(key)).st_size
+
+
+def test_put_sweeps_in_the_background(tmp_path, monkeypatch):
+    store = make_store(tmp_path, sweep_interval=0)
+    swept = []
+    monkeypatch.setattr(store, "prune", lambda: swept.append(True) or 0)
+    store.put(b"trigger")
+    for _ in range(100):
+        if swept:
+            break
+        time.sleep(0.01)
+    assert swept